@@ -0,0 +1,138 @@
+"""
+Graph latency benchmark.
+
+Drives build_graph() over a fixed question set with N concurrent conversations
+and reports per-node latency percentiles, prompt sizes and throughput. Use the
+deterministic local model for reproducible numbers:
+
+    python -m benchmarks.graph_benchmark --provider fake --conversations 8 --turns 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+
+DEFAULT_QUESTIONS = [
+    "What is the travel policy for booking flights?",
+    "Who owns the travel policy?",
+    "How many days of annual leave do employees get?",
+    "What is the review cycle of the leave policy?",
+    "Can I carry over unused leave to next year?",
+    "Which expenses need manager approval?",
+    "What is the status of the remote work policy?",
+    "How do I submit an expense claim?",
+]
+
+# Nodes reported first, in pipeline order; any others follow alphabetically
+KEY_NODES = ["retrieve", "agent", "generate"]
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    arr = np.asarray(values, dtype=float)
+    return {
+        "count": int(arr.size),
+        "p50": float(np.percentile(arr, 50)),
+        "p95": float(np.percentile(arr, 95)),
+        "p99": float(np.percentile(arr, 99)),
+        "mean": float(arr.mean()),
+    }
+
+async def run_conversation(app, thread_id: str, questions: List[str], offset: int, turns: int, results: dict):
+    from langchain_core.messages import HumanMessage
+
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(turns):
+        question = questions[(offset + turn) % len(questions)]
+        state = {"messages": [HumanMessage(content=question)], "context": "", "metadata_text": "", "tool_called": False, "filters": None}
+        started: Dict[str, float] = {}
+        turn_start = time.perf_counter()
+        final = {}
+        async for mode, payload in app.astream(state, config=config, stream_mode=["debug", "values"]):
+            if mode == "values":
+                final = payload
+                continue
+            event, task = payload.get("type"), payload.get("payload", {})
+            if event == "task":
+                started[task["id"]] = time.perf_counter()
+            elif event == "task_result" and task.get("id") in started:
+                results["nodes"][task["name"]].append(time.perf_counter() - started.pop(task["id"]))
+        results["turns"].append(time.perf_counter() - turn_start)
+        results["cache_hits"] += bool(final.get("cache_hit"))
+        if final.get("prompt_tokens"):
+            results["prompt_tokens"][turn].append(final["prompt_tokens"])
+
+async def run_benchmark(questions: List[str], conversations: int, turns: int) -> dict:
+    from graphs.policy_graph import build_graph
+
+    app = build_graph()
+    run_id = uuid.uuid4().hex[:8]
+    threads = [f"bench-{run_id}-{i}" for i in range(conversations)]
+    results = {"nodes": defaultdict(list), "turns": [], "prompt_tokens": defaultdict(list), "cache_hits": 0}
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[
+        run_conversation(app, thread, questions, i, turns, results) for i, thread in enumerate(threads)
+    ])
+    wall = time.perf_counter() - wall_start
+
+    for thread in threads:
+        await app.checkpointer.adelete_thread(thread)
+
+    ordered = KEY_NODES + sorted(n for n in results["nodes"] if n not in KEY_NODES)
+    return {
+        "conversations": conversations,
+        "turns_per_conversation": turns,
+        "wall_seconds": wall,
+        "throughput_turns_per_second": len(results["turns"]) / wall if wall else 0.0,
+        "turn_latency": percentiles(results["turns"]),
+        "answer_cache_hits": results["cache_hits"],
+        "nodes": {n: percentiles(results["nodes"][n]) for n in ordered if results["nodes"].get(n)},
+        "prompt_tokens_by_turn": {
+            turn + 1: percentiles(sizes) for turn, sizes in sorted(results["prompt_tokens"].items())
+        },
+    }
+
+def print_report(report: dict) -> None:
+    print(f"\nConversations: {report['conversations']} x {report['turns_per_conversation']} turns "
+          f"in {report['wall_seconds']:.2f}s "
+          f"→ {report['throughput_turns_per_second']:.2f} turns/s")
+    t = report["turn_latency"]
+    print(f"Turn latency (ms): p50={t['p50'] * 1000:.1f} p95={t['p95'] * 1000:.1f} p99={t['p99'] * 1000:.1f}")
+    print(f"Answer cache hits: {report['answer_cache_hits']}/{t['count']}")
+
+    print(f"\n{'node':<20}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for node, s in report["nodes"].items():
+        print(f"{node:<20}{s['count']:>7}{s['p50'] * 1000:>10.1f}{s['p95'] * 1000:>10.1f}{s['p99'] * 1000:>10.1f}")
+
+    print(f"\n{'turn':<6}{'prompt tokens p50':>19}{'p95':>8}")
+    for turn, s in report["prompt_tokens_by_turn"].items():
+        print(f"{turn:<6}{s['p50']:>19.0f}{s['p95']:>8.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the policy graph end to end")
+    parser.add_argument("--provider", help="LLM provider override (e.g. fake)")
+    parser.add_argument("--conversations", type=int, default=4, help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per conversation")
+    parser.add_argument("--questions", type=Path, help="File with one question per line")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.provider:
+        os.environ["LLM_PROVIDER"] = args.provider
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        questions = [q.strip() for q in args.questions.read_text().splitlines() if q.strip()]
+
+    report = asyncio.run(run_benchmark(questions, args.conversations, args.turns))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
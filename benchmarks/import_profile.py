@@ -0,0 +1,86 @@
+"""
+Import-time profile.
+
+Imports each entry module in a fresh interpreter with `-X importtime` and
+reports total import time plus the top-level packages that dominate it, then
+times `python main.py --help` as the cold-start figure:
+
+    python -m benchmarks.import_profile --top 10
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["main", "graphs.policy_graph", "pipeline.ingest_pdfs"]
+
+def import_times(module: str) -> Dict[str, float]:
+    """Cumulative import time (ms) per module, as reported by -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    times = {}
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+def top_packages(times: Dict[str, float], top: int) -> List[Dict[str, float]]:
+    """Largest top-level packages by the cumulative time of their outermost import"""
+    packages = defaultdict(float)
+    for name, ms in times.items():
+        # Nested imports are contained in the outer one; namespace packages
+        # (e.g. langgraph) only show up through their submodules
+        root = name.split(".")[0]
+        packages[root] = max(packages[root], ms)
+    ranked = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return [{"package": name, "ms": round(ms, 1)} for name, ms in ranked]
+
+def help_time(runs: int = 3) -> float:
+    """Best wall time (ms) of `python main.py --help`"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=ROOT, capture_output=True, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of the app entry points")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--top", type=int, default=8, help="Packages listed per module")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = {"modules": {}}
+    for module in args.modules:
+        times = import_times(module)
+        report["modules"][module] = {
+            "total_ms": round(times.get(module, 0.0), 1),
+            "top_packages": top_packages(times, args.top),
+        }
+    report["main_help_ms"] = round(help_time(), 1)
+
+    for module, info in report["modules"].items():
+        print(f"\nimport {module}: {info['total_ms']:.1f} ms")
+        for item in info["top_packages"]:
+            print(f"  {item['package']:<32} {item['ms']:>8.1f} ms")
+    print(f"\npython main.py --help: {report['main_help_ms']:.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+DocumentTracker scan benchmark.
+
+Creates a directory of small PDF-named files, registers them all, then times
+`get_unprocessed_files` on a fresh tracker without the stat -> hash cache
+(every file is read and hashed) and with it (unchanged files are only
+stat'ed), plus a scan after a few files were modified:
+
+    python -m benchmarks.tracker_scan --files 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from pipeline.document_tracker import DocumentTracker
+from pipeline.schema import DocMeta
+
+def make_corpus(directory: Path, files: int, size_kb: int) -> list:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(files):
+        path = directory / f"policy_{i:05d}.pdf"
+        path.write_bytes(os.urandom(size_kb * 1024))
+        paths.append(path)
+    return paths
+
+def timed_scan(registry: Path, directory: Path) -> dict:
+    start = time.perf_counter()
+    tracker = DocumentTracker(str(registry))
+    unprocessed = tracker.get_unprocessed_files(directory)
+    return {"seconds": round(time.perf_counter() - start, 3), "unprocessed": len(unprocessed)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--modified", type=int, default=10, help="files rewritten before the last scan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        # The tracker bumps data/corpus_version.json relative to the working directory
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            pdfs = root / "pdfs"
+            registry = root / "registry.json"
+            paths = make_corpus(pdfs, args.files, args.size_kb)
+            tracker = DocumentTracker(str(registry))
+            tracker.register_documents([(p, DocMeta(title=p.stem, source=p.name)) for p in paths])
+
+            report = {"files": args.files, "size_kb": args.size_kb}
+            tracker.hash_cache_file.unlink()
+            report["cold_scan"] = timed_scan(registry, pdfs)
+            report["warm_scan"] = timed_scan(registry, pdfs)
+            for p in paths[:args.modified]:
+                p.write_bytes(os.urandom(args.size_kb * 1024))
+            report["modified_scan"] = timed_scan(registry, pdfs)
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
+import copy
 import os
 from pathlib import Path
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+# Parsed YAML per path, reused until the file changes (YAML parsing dominates load time)
+_PARSED: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+def _parse(config_path: str) -> Dict[str, Any]:
+    mtime = os.stat(config_path).st_mtime_ns
+    cached = _PARSED.get(config_path)
+    if cached is None or cached[0] != mtime:
+        with open(config_path, 'r') as f:
+            cached = _PARSED[config_path] = (mtime, yaml.safe_load(f))
+    return cached[1]
 
 def load_config(config_path: str = "configs/app_config.yaml") -> Dict[str, Any]:
     """Load application configuration from YAML file"""
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # Callers get their own copy; the parsed file is shared
+        config = copy.deepcopy(_parse(config_path))
             
         # Override with environment variables if set
         if os.getenv("CHROMA_DIR"):
@@ -20,3 +32,16 @@ def load_config(config_path: str = "configs/app_config.yaml") -> Dict[str, Any]:
         
     except Exception as e:
         raise RuntimeError(f"Failed to load config from {config_path}: {str(e)}")
+
+_shared: Optional[Dict[str, Any]] = None
+
+def get_config() -> Dict[str, Any]:
+    """
+    Process-wide configuration, loaded on first use rather than at import.
+    Shared by every caller, so treat it as read-only; use load_config() for
+    a private copy.
+    """
+    global _shared
+    if _shared is None:
+        _shared = load_config()
+    return _shared
@@ -0,0 +1,241 @@
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for cache lookups (case, punctuation, whitespace)"""
+    text = _PUNCT_RE.sub(" ", (text or "").lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings keyed by normalized query text, for one
+    embedding model. Bounded by entry count and approximate memory; optionally
+    persisted to disk, where a file written for another model is ignored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        max_bytes: int = 32 * 1024 * 1024,
+        persist_path: Optional[str] = None,
+        model_name: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: "OrderedDict[str, array]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.persist_path:
+            self._load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def _entry_size(key: str, vec: array) -> int:
+        return len(key) + vec.itemsize * len(vec)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = normalize_query(text)
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vec.tolist()
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        key = normalize_query(text)
+        vec = array("f", embedding)
+        size = self._entry_size(key, vec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            self._entries[key] = vec
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                k, v = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(k, v)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current size for sizing the cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _load(self) -> None:
+        if not self.persist_path.exists():
+            return
+        try:
+            with self.persist_path.open("r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[WARN] Ignoring unreadable query embedding cache {self.persist_path}: {e}")
+            return
+        if data.get("model") != self.model_name:
+            print(f"[INFO] Ignoring query embedding cache written for model {data.get('model')!r}")
+            return
+        # Stored oldest → newest so LRU order survives a restart
+        for key, embedding in data.get("entries", []):
+            self.put(key, embedding)
+
+    def save(self) -> None:
+        """Write the cache to persist_path (if configured)"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            entries = [[k, v.tolist()] for k, v in self._entries.items()]
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.persist_path.with_suffix(self.persist_path.suffix + ".tmp")
+        with tmp.open("w") as f:
+            json.dump({"model": self.model_name, "entries": entries}, f)
+        os.replace(tmp, self.persist_path)
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    Encode several queries exactly as embed_query would (query prompt and
+    query encode kwargs included). HuggingFaceEmbeddings encodes the whole
+    batch in one call; other models get one embed_query call per text.
+    """
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(texts)
+    if hasattr(embeddings, "_embed") and hasattr(embeddings, "query_encode_kwargs"):
+        # Same kwargs selection as HuggingFaceEmbeddings.embed_query
+        kwargs = embeddings.query_encode_kwargs or embeddings.encode_kwargs
+        return embeddings._embed(texts, kwargs)
+    return [embeddings.embed_query(text) for text in texts]
+
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper that serves embed_query from a QueryEmbeddingCache"""
+
+    def __init__(self, base: Embeddings, cache: QueryEmbeddingCache):
+        self.base = base
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vec = self.cache.get(text)
+        if vec is None:
+            vec = self.base.embed_query(text)
+            self.cache.put(text, vec)
+        return vec
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """embed_query for many texts: cached ones are served, the rest encoded in one batch"""
+        vecs = [self.cache.get(text) for text in texts]
+        missing = [i for i, vec in enumerate(vecs) if vec is None]
+        if missing:
+            encoded = embed_queries(self.base, [texts[i] for i in missing])
+            for i, vec in zip(missing, encoded):
+                vecs[i] = vec
+                self.cache.put(texts[i], vec)
+        return vecs
+
+class ChunkEmbeddingCache:
+    """
+    Persistent document-chunk embeddings keyed by (content hash, model name),
+    stored in SQLite so re-ingestion and rebuilds only embed text never seen
+    before. Vectors are kept as float32 blobs.
+    """
+
+    _MAX_PARAMS = 500  # Stay well under SQLite's bound-parameter limit
+
+    def __init__(self, path: str, model_name: str):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_embeddings ("
+            "model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, hash)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, hashes) -> Dict[str, List[float]]:
+        """Cached vectors for whichever of `hashes` have been embedded before"""
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(hashes), self._MAX_PARAMS):
+                part = hashes[i:i + self._MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM chunk_embeddings WHERE model = ? "
+                    f"AND hash IN ({','.join('?' * len(part))})",
+                    [self.model_name, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[h] = vec.tolist()
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunk_embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(self.model_name, h, array("f", v).tobytes()) for h, v in vectors.items()],
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+_chunk_caches: Dict[tuple, ChunkEmbeddingCache] = {}
+_chunk_caches_lock = threading.Lock()
+
+def get_chunk_embedding_cache(cfg: dict, model_name: Optional[str]) -> Optional[ChunkEmbeddingCache]:
+    """Process-wide chunk embedding cache for model_name, or None if disabled"""
+    cache_cfg = cfg.get("cache", {}).get("chunk_embeddings", {})
+    if not model_name or not cache_cfg.get("enabled", False):
+        return None
+    key = (cache_cfg.get("path", "data/cache/chunk_embeddings.sqlite"), model_name)
+    with _chunk_caches_lock:
+        cache = _chunk_caches.get(key)
+        if cache is None:
+            cache = _chunk_caches[key] = ChunkEmbeddingCache(*key)
+        return cache
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+_WORDS = (
+    "policy employees must approval manager review annual leave travel expenses "
+    "document owner status published effective date requirements process applies "
+    "request submit finance department compliance according section guidelines"
+).split()
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local stand-in for the hosted chat model.
+
+    The same prompt always yields the same answer. When tools are bound and the
+    latest user message matches `tool_pattern`, the first reply is a call to the
+    first tool with the question as its argument; after the tool result it
+    answers normally. `latency_ms` is the time to first token and
+    `tokens_per_second` paces the rest of the reply.
+    """
+
+    latency_ms: float = 200.0
+    tokens_per_second: float = 50.0
+    response_tokens: int = 60
+    tool_pattern: str = r"\b(own\w*|status|manag\w*|review\w*|metadata)\b"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _tool_call(self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]) -> Optional[dict]:
+        if not tools or not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+        query = messages[-1].content
+        if not re.search(self.tool_pattern, query, re.I):
+            return None
+        fn = tools[0]["function"]
+        arg = next(iter(fn.get("parameters", {}).get("properties", {})), "query")
+        call_id = "call_" + hashlib.sha1(query.encode()).hexdigest()[:12]
+        return {"name": fn["name"], "args": {arg: query}, "id": call_id}
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        seed = hashlib.sha256("\n".join(str(m.content) for m in messages).encode()).hexdigest()
+        rng = random.Random(seed)
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+        prefix = f"Based on {len(tool_results)} tool result(s): " if tool_results else ""
+        return prefix + " ".join(rng.choice(_WORDS) for _ in range(self.response_tokens)) + "."
+
+    def _reply(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> AIMessage:
+        call = self._tool_call(messages, kwargs.get("tools"))
+        if call:
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content=self._answer(messages))
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _total_delay(self, msg: AIMessage) -> float:
+        tokens = len(msg.content.split())
+        return self.latency_ms / 1000 + max(tokens - 1, 0) * self._token_delay()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        msg = self._reply(messages, kwargs)
+        time.sleep(self._total_delay(msg))
+        return ChatResult(generations=[ChatGeneration(message=msg)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        msg = self._reply(messages, kwargs)
+        await asyncio.sleep(self._total_delay(msg))
+        return ChatResult(generations=[ChatGeneration(message=msg)])
+
+    def _chunks(self, msg: AIMessage):
+        if msg.tool_calls:
+            call = msg.tool_calls[0]
+            yield AIMessageChunk(content="", tool_call_chunks=[{
+                "name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0,
+            }])
+            return
+        words = msg.content.split(" ")
+        for i, word in enumerate(words):
+            yield AIMessageChunk(content=word if i == 0 else " " + word)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        msg = self._reply(messages, kwargs)
+        time.sleep(self.latency_ms / 1000)
+        for i, chunk in enumerate(self._chunks(msg)):
+            if i:
+                time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        msg = self._reply(messages, kwargs)
+        await asyncio.sleep(self.latency_ms / 1000)
+        for i, chunk in enumerate(self._chunks(msg)):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=chunk)
@@ -1,15 +1,335 @@
+import asyncio
+import hashlib
+import json
 import os
-from common.config import load_config
-from langchain_groq import ChatGroq
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+from common.config import get_config
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from pydantic import PrivateAttr
 from dotenv import load_dotenv
 
 load_dotenv()
-_cfg = load_config()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-def get_llm():
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def _llm_cfg() -> Dict[str, Any]:
+    """llm section of the config, loaded on first use rather than at import"""
+    return get_config()["llm"]
+
+def _pool_cfg() -> Dict[str, Any]:
+    return _llm_cfg().get("pool", {})
+
+def _status_code(exc: Exception) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if _status_code(exc) in _RETRYABLE_STATUS:
+        return True
+    return "RateLimit" in type(exc).__name__
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Honour Retry-After when the server sends it, else exponential backoff with jitter"""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after", ""))
+    except ValueError:
+        retry_after = None
+    if retry_after is not None:
+        return min(retry_after, _pool_cfg().get("backoff_max", 8.0))
+    base = _pool_cfg().get("backoff_base", 0.5)
+    return min(base * (2 ** attempt), _pool_cfg().get("backoff_max", 8.0)) * random.uniform(0.5, 1.0)
+
+def _request_key(messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+    payload = {
+        "messages": [
+            [m.type, m.content, getattr(m, "tool_calls", None), getattr(m, "tool_call_id", None)]
+            for m in messages
+        ],
+        "stop": stop,
+        "kwargs": kwargs,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class _Coalescer:
+    """Identical requests in flight at the same time share one upstream call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+_coalescer = _Coalescer()
+_sync_limiter: Optional[threading.BoundedSemaphore] = None
+# Per event loop (asyncio primitives and async HTTP clients are bound to one
+# loop). Weak keys drop entries with their loop; a semaphore that has had
+# waiters references its loop, so entries of closed loops are also pruned
+# whenever a new loop appears.
+_async_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_async_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+# Re-entrant: a per-loop factory may itself look up per-loop state
+_loops_lock = threading.RLock()
+# Re-entrant: get_llm() builds the provider model (and its HTTP clients) while holding it
+_init_lock = threading.RLock()
+
+def _get_sync_limiter() -> threading.BoundedSemaphore:
+    global _sync_limiter
+    if _sync_limiter is None:
+        with _init_lock:
+            if _sync_limiter is None:
+                _sync_limiter = threading.BoundedSemaphore(_pool_cfg().get("max_concurrency", 8))
+    return _sync_limiter
+
+def _per_loop(states: weakref.WeakKeyDictionary, factory: Callable[[], Any]) -> Any:
+    loop = asyncio.get_running_loop()
+    with _loops_lock:
+        state = states.get(loop)
+        if state is None:
+            for old in [l for l in states.keys() if l.is_closed()]:
+                del states[old]
+            state = states[loop] = factory()
+    return state
+
+def _get_async_limiter() -> asyncio.Semaphore:
+    return _per_loop(_async_limiters, lambda: asyncio.Semaphore(_pool_cfg().get("max_concurrency", 8)))
+
+def _get_async_inflight() -> Dict[str, asyncio.Future]:
+    return _per_loop(_async_inflight, dict)
+
+class PooledChatModel(BaseChatModel):
+    """
+    Wraps a provider chat model with process-level request controls:
+    a cap on concurrent requests, retry with backoff on rate limits and
+    transient errors, and coalescing of identical in-flight requests.
+    """
+
+    inner: BaseChatModel
+    # Builds the model async calls use on each event loop, for providers whose
+    # async HTTP client is bound to the loop it was created on
+    async_inner: Optional[Callable[[], BaseChatModel]] = None
+    _async_inners: weakref.WeakKeyDictionary = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"pooled-{self.inner._llm_type}"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        # Let the provider format the tools, then bind the same kwargs to the wrapper
+        bound = self.inner.bind_tools(tools, tool_choice=tool_choice, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _loop_inner(self) -> BaseChatModel:
+        if self.async_inner is None:
+            return self.inner
+        return _per_loop(self._async_inners, self.async_inner)
+
+    def _with_retry(self, fn: Callable[[], Any]) -> Any:
+        attempts = _pool_cfg().get("max_retries", 4) + 1
+        for attempt in range(attempts):
+            try:
+                with _get_sync_limiter():
+                    return fn()
+            except Exception as e:
+                if attempt == attempts - 1 or not _is_retryable(e):
+                    raise
+                time.sleep(_retry_delay(e, attempt))
+
+    async def _awith_retry(self, fn: Callable[[], Any]) -> Any:
+        attempts = _pool_cfg().get("max_retries", 4) + 1
+        for attempt in range(attempts):
+            try:
+                async with _get_async_limiter():
+                    return await fn()
+            except Exception as e:
+                if attempt == attempts - 1 or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(_retry_delay(e, attempt))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = _request_key(messages, stop, kwargs)
+        return _coalescer.run(
+            key,
+            lambda: self._with_retry(
+                lambda: self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            ),
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = _request_key(messages, stop, kwargs)
+        inflight = _get_async_inflight()
+        inner = self._loop_inner()
+        fut = inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._awith_retry(
+                lambda: inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            )
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            # Mark retrieved so followers-less failures don't warn on GC
+            fut.exception()
+            raise
+        finally:
+            inflight.pop(key, None)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Streams are not coalesced; retries only happen before the first chunk
+        attempts = _pool_cfg().get("max_retries", 4) + 1
+        for attempt in range(attempts):
+            with _get_sync_limiter():
+                stream = self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                try:
+                    first = next(stream)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    if attempt == attempts - 1 or not _is_retryable(e):
+                        raise
+                    retry_in = _retry_delay(e, attempt)
+                else:
+                    yield first
+                    yield from stream
+                    return
+            time.sleep(retry_in)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        attempts = _pool_cfg().get("max_retries", 4) + 1
+        inner = self._loop_inner()
+        for attempt in range(attempts):
+            async with _get_async_limiter():
+                stream = inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                try:
+                    first = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    if attempt == attempts - 1 or not _is_retryable(e):
+                        raise
+                    retry_in = _retry_delay(e, attempt)
+                else:
+                    yield first
+                    async for chunk in stream:
+                        yield chunk
+                    return
+            await asyncio.sleep(retry_in)
+
+_http_client: Optional[httpx.Client] = None
+_llm: Optional[PooledChatModel] = None
+
+def _http_limits() -> httpx.Limits:
+    pool = _pool_cfg()
+    return httpx.Limits(
+        max_connections=pool.get("max_connections", 20),
+        max_keepalive_connections=pool.get("max_keepalive", 10),
+        keepalive_expiry=pool.get("keepalive_expiry", 30),
+    )
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(_pool_cfg().get("timeout", 60))
+
+def get_http_client() -> httpx.Client:
+    """Process-wide keep-alive HTTP client shared by every sync LLM call"""
+    global _http_client
+    if _http_client is None:
+        with _init_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+    return _http_client
+
+async def _close_with_loop(client: httpx.AsyncClient):
+    # Parked at the yield until the loop shuts down its async generators
+    # (asyncio.run does on exit), which closes the client on its own loop
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+def _new_async_http_client() -> tuple:
+    client = httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout())
+    closer = _close_with_loop(client)
+    asyncio.ensure_future(closer.__anext__())
+    return client, closer
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Keep-alive async HTTP client shared by the LLM calls of the running event loop"""
+    return _per_loop(_async_http_clients, _new_async_http_client)[0]
+
+def _groq_model(http_async_client: Optional[httpx.AsyncClient] = None) -> BaseChatModel:
+    from langchain_groq import ChatGroq
+
     return ChatGroq(
-        model=_cfg["llm"]["model"],
-        temperature=_cfg["llm"]["temperature"]
-    )
\ No newline at end of file
+        model=_llm_cfg()["model"],
+        temperature=_llm_cfg()["temperature"],
+        http_client=get_http_client(),
+        http_async_client=http_async_client,
+        max_retries=0,  # retries are handled by PooledChatModel
+    )
+
+def _groq_loop_model() -> BaseChatModel:
+    return _groq_model(get_async_http_client())
+
+def _fake_model() -> BaseChatModel:
+    from common.fake_llm import FakeChatModel
+    return FakeChatModel(**_llm_cfg().get("fake", {}))
+
+PROVIDERS: Dict[str, Callable[[], BaseChatModel]] = {
+    "groq": _groq_model,
+    "fake": _fake_model,
+}
+# Providers whose async clients are bound to an event loop get a model per loop
+LOOP_PROVIDERS: Dict[str, Callable[[], BaseChatModel]] = {
+    "groq": _groq_loop_model,
+}
+
+def get_provider() -> str:
+    """LLM provider from LLM_PROVIDER or llm.provider (default groq)"""
+    return os.getenv("LLM_PROVIDER") or _llm_cfg().get("provider", "groq")
+
+def get_llm() -> PooledChatModel:
+    """Return the process-wide pooled chat model (built once)"""
+    global _llm
+    if _llm is None:
+        with _init_lock:
+            if _llm is None:
+                provider = get_provider()
+                if provider not in PROVIDERS:
+                    raise ValueError(f"Unknown LLM provider '{provider}' (expected one of {sorted(PROVIDERS)})")
+                _llm = PooledChatModel(inner=PROVIDERS[provider](), async_inner=LOOP_PROVIDERS.get(provider))
+    return _llm
@@ -93,6 +93,26 @@ def init_logger(
 
     return logger, session_path
 
+class _LazyLogger:
+    """
+    Stands in for the session logger until it is first used, so importing a
+    module creates no session directory. If the entry point already called
+    init_logger(name), that logger and session are used as-is.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr):
+        logger = logging.getLogger(self._name)
+        if not logger.handlers:
+            logger, _ = init_logger(self._name)
+        return getattr(logger, attr)
+
+def get_logger(name: str = "policy") -> logging.Logger:
+    """Module-level logger that initializes the session on first use"""
+    return _LazyLogger(name)
+
 def _remove_existing_handlers(logger: logging.Logger) -> None:
     for h in list(logger.handlers):
         logger.removeHandler(h)
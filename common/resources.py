@@ -0,0 +1,138 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+class RetrievalResources:
+    """
+    Process-wide registry for the embedding model and vector store client.
+
+    Both are loaded lazily on first use and shared by every caller in the
+    process. The vector store is rebuilt whenever the relevant config values
+    change or the collection is invalidated (e.g. after VectorStore.reset()).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embeddings: Dict[str, Any] = {}
+        self._query_caches: Dict[str, Any] = {}
+        self._lexical_index = None
+        self._title_index = None
+        self._vectordb = None
+        self._vectordb_key: Optional[Tuple] = None
+        self._generation = 0
+
+    @staticmethod
+    def _store_key(cfg: Dict[str, Any]) -> Tuple:
+        vs = cfg["vector_store"]
+        return (
+            vs["embedding_model"],
+            vs["persist_directory"],
+            vs["collection_name"],
+            vs.get("backend", "chroma"),
+            vs.get("numpy", {}).get("dtype", "float16"),
+        )
+
+    def get_embeddings(self, model_name: str):
+        """Return the shared embedding model for model_name, loading it once"""
+        emb = self._embeddings.get(model_name)
+        if emb is not None:
+            return emb
+        with self._lock:
+            emb = self._embeddings.get(model_name)
+            if emb is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+                emb = HuggingFaceEmbeddings(model_name=model_name)
+                self._embeddings[model_name] = emb
+            return emb
+
+    def get_query_cache(self, cfg: Dict[str, Any]):
+        """Return the shared query-embedding cache for the configured model, or None if disabled"""
+        cache_cfg = cfg.get("cache", {}).get("query_embeddings", {})
+        if not cache_cfg.get("enabled", False):
+            return None
+        model_name = cfg["vector_store"]["embedding_model"]
+        cache = self._query_caches.get(model_name)
+        if cache is None:
+            with self._lock:
+                cache = self._query_caches.get(model_name)
+                if cache is None:
+                    from common.embedding_cache import QueryEmbeddingCache
+                    cache = self._query_caches[model_name] = QueryEmbeddingCache(
+                        max_entries=cache_cfg.get("max_entries", 2048),
+                        max_bytes=int(cache_cfg.get("max_mb", 32) * 1024 * 1024),
+                        persist_path=cache_cfg.get("persist_path"),
+                        model_name=model_name,
+                    )
+        return cache
+
+    def get_query_embeddings(self, cfg: Dict[str, Any]):
+        """Return the embedding function used to encode queries (cached if enabled)"""
+        embeddings = self.get_embeddings(cfg["vector_store"]["embedding_model"])
+        cache = self.get_query_cache(cfg)
+        if cache is None:
+            return embeddings
+        from common.embedding_cache import CachedQueryEmbeddings
+        return CachedQueryEmbeddings(embeddings, cache)
+
+    def get_vectordb(self, cfg: Dict[str, Any]):
+        """Return the shared vector store client for cfg, rebuilding it if stale"""
+        key = self._store_key(cfg) + (self._generation,)
+        db = self._vectordb
+        if db is not None and self._vectordb_key == key:
+            return db
+        with self._lock:
+            key = self._store_key(cfg) + (self._generation,)
+            if self._vectordb is None or self._vectordb_key != key:
+                from pipeline.storage.vector_store import open_vector_db
+                vs = cfg["vector_store"]
+                self._vectordb = open_vector_db(
+                    vs["persist_directory"],
+                    vs["collection_name"],
+                    self.get_query_embeddings(cfg),
+                    backend=vs.get("backend", "chroma"),
+                    numpy_dtype=vs.get("numpy", {}).get("dtype", "float16"),
+                )
+                self._vectordb_key = key
+            return self._vectordb
+
+    def get_retriever(self, cfg: Dict[str, Any]):
+        """Return a retriever over the shared vector store"""
+        return self.get_vectordb(cfg).as_retriever(
+            search_kwargs={"k": cfg["vector_store"]["top_k"]}
+        )
+
+    def get_lexical_index(self, cfg: Dict[str, Any]):
+        """Return the shared BM25 index, reloading it if another process changed it"""
+        path = cfg["retrieval"]["hybrid"]["lexical_index"]
+        with self._lock:
+            index = self._lexical_index
+            if index is None or str(index.path) != str(path):
+                from pipeline.storage.lexical_index import BM25Index
+                self._lexical_index = index = BM25Index(path)
+            elif index.is_stale():
+                index.reload()
+            return index
+
+    def get_title_index(self, cfg: Dict[str, Any]):
+        """Return the shared title → chunk-id index, reloading it if rewritten"""
+        path = cfg["retrieval"]["filters"]["title_index"]
+        with self._lock:
+            index = self._title_index
+            if index is None or str(index.path) != str(path):
+                from pipeline.storage.title_index import TitleIndex
+                self._title_index = index = TitleIndex(path)
+            elif index.is_stale():
+                index.reload()
+            return index
+
+    def invalidate(self) -> None:
+        """Drop the cached vector store client so the next call reopens it"""
+        with self._lock:
+            self._generation += 1
+            self._vectordb = None
+            self._vectordb_key = None
+
+_RESOURCES = RetrievalResources()
+
+def get_resources() -> RetrievalResources:
+    """Return the process-wide retrieval resource registry"""
+    return _RESOURCES
@@ -0,0 +1,221 @@
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from common.config import load_config
+
+# Switched on via telemetry.enabled; when off every helper below is a no-op and
+# traced() returns the function unchanged, so instrumented code pays nothing.
+_cfg = load_config().get("telemetry", {})
+ENABLED = bool(_cfg.get("enabled", False))
+
+METRIC_PREFIX = "policy"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NOOP = nullcontext()
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("span", default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Metrics:
+    """Process-wide counters and duration histograms, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[name][_labels(labels)] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            hist = self._histograms[name].get(key)
+            if hist is None:
+                hist = self._histograms[name][key] = [0.0] * (len(DURATION_BUCKETS) + 2)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    @staticmethod
+    def _fmt(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = f"{METRIC_PREFIX}_{name}_total"
+                lines.append(f"# TYPE {full} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}{self._fmt(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                full = f"{METRIC_PREFIX}_{name}"
+                lines.append(f"# TYPE {full} histogram")
+                for labels, hist in sorted(series.items()):
+                    for i, bound in enumerate(DURATION_BUCKETS):
+                        lines.append(f"{full}_bucket{self._fmt(labels, (('le', f'{bound:g}'),))} {hist[i]:g}")
+                    lines.append(f"{full}_bucket{self._fmt(labels, (('le', '+Inf'),))} {hist[-1]:g}")
+                    lines.append(f"{full}_sum{self._fmt(labels)} {hist[-2]:.6f}")
+                    lines.append(f"{full}_count{self._fmt(labels)} {hist[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+class Trace:
+    """Spans and attributes recorded for one request (a graph turn or an ingestion run)"""
+
+    def __init__(self, name: str, **attrs):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attrs = dict(attrs)
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": (time.perf_counter() - self.started) * 1000,
+            "attrs": self.attrs,
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+metrics = Metrics()
+
+def session_dir() -> Optional[Path]:
+    """Directory of the session log file the app logger currently writes to"""
+    for handler in logging.getLogger("policy").handlers:
+        if isinstance(handler, logging.FileHandler):
+            return Path(handler.baseFilename).parent
+    return None
+
+def export_metrics() -> None:
+    out_dir = session_dir()
+    if out_dir is None:
+        return
+    path = out_dir / _cfg.get("metrics_file", "metrics.prom")
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(metrics.render(), encoding="utf-8")
+    tmp.replace(path)
+
+def _export_trace(trace: Trace) -> None:
+    out_dir = session_dir()
+    if out_dir is None or not _cfg.get("traces", True):
+        return
+    trace_dir = out_dir / "traces"
+    trace_dir.mkdir(parents=True, exist_ok=True)
+    path = trace_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{trace.name}-{trace.trace_id[:8]}.json"
+    path.write_text(json.dumps(trace.to_dict(), indent=2, default=str), encoding="utf-8")
+
+if ENABLED:
+    atexit.register(export_metrics)
+
+@contextmanager
+def _trace(name: str, **attrs):
+    trace = Trace(name, **attrs)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        metrics.observe("request_duration_seconds", time.perf_counter() - trace.started, request=name)
+        try:
+            _export_trace(trace)
+            export_metrics()
+        except Exception as e:
+            logging.getLogger("policy").error(f"Telemetry export failed: {e}")
+
+def trace(name: str, **attrs):
+    """Context manager grouping every span recorded inside it into one JSON trace"""
+    return _trace(name, **attrs) if ENABLED else _NOOP
+
+@contextmanager
+def _span(name: str, **attrs):
+    parent = _current_span.get()
+    trace_ = _current_trace.get()
+    start = time.perf_counter()
+    span = {
+        "name": name,
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "attrs": dict(attrs),
+    }
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span["attrs"]["error"] = repr(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        duration = time.perf_counter() - start
+        metrics.observe("span_duration_seconds", duration, span=name)
+        if trace_ is not None:
+            span["start_ms"] = (start - trace_.started) * 1000
+            span["duration_ms"] = duration * 1000
+            trace_.add_span(span)
+
+def span(name: str, **attrs):
+    """Time a block as a span of the current trace (and in the duration histogram)"""
+    return _span(name, **attrs) if ENABLED else _NOOP
+
+def record(**attrs) -> None:
+    """Attach attributes to the innermost open span (or the trace when no span is open)"""
+    if not ENABLED:
+        return
+    current = _current_span.get()
+    if current is not None:
+        current["attrs"].update(attrs)
+    elif _current_trace.get() is not None:
+        _current_trace.get().attrs.update(attrs)
+
+def count(name: str, value: float = 1, **labels) -> None:
+    """Increment a counter (exported as policy_<name>_total)"""
+    if ENABLED:
+        metrics.inc(name, value, **labels)
+
+def traced(name: str):
+    """Decorator: run the (sync or async) function inside span(name)"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
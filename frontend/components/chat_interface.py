@@ -1,33 +1,67 @@
 import streamlit as st
 from langchain_core.messages import HumanMessage, AIMessage
 from frontend.utils.reference_formatter import format_references
+from graphs.streaming import stream_turn
+from common import telemetry
+from common.config import load_config
+
+STREAMING = load_config()["llm"].get("streaming", False)
 
 def process_query(query: str) -> tuple[str, str]:
     """Process user query and return response with references"""
-    current_message = HumanMessage(content=query)
-    st.session_state.conversation_history.append(current_message)
-    
+    # Only the new message: earlier turns are restored from the session's checkpoint
     init_state = {
-        "messages": st.session_state.conversation_history.copy(),
+        "messages": [HumanMessage(content=query)],
         "context": "",
         "metadata_text": "",
         "tool_called": False,
+        "filters": None,
     }
     
-    final_state = st.session_state.app.invoke(
-        init_state,
-        config={"configurable": {"thread_id": "streamlit-session"}},
-    )
+    with telemetry.trace("turn", thread_id=st.session_state.thread_id, streaming=False):
+        final_state = st.session_state.app.invoke(
+            init_state,
+            config={"configurable": {"thread_id": st.session_state.thread_id}},
+        )
     
     msgs = final_state["messages"]
     ai_msgs = [m for m in msgs if isinstance(m, AIMessage)]
     response = ai_msgs[-1].content if ai_msgs else "(no response)"
-    
-    st.session_state.conversation_history.append(AIMessage(content=response))
     context = final_state.get("context", "")
     
     return response, context
 
+def stream_query(query: str, status, result: dict):
+    """
+    Stream the answer to query token by token (for st.write_stream), updating
+    `status` with node progress. The final answer and context land in `result`.
+    """
+    init_state = {
+        "messages": [HumanMessage(content=query)],
+        "context": "",
+        "metadata_text": "",
+        "tool_called": False,
+        "filters": None,
+    }
+
+    streamed = ""
+    config = {"configurable": {"thread_id": st.session_state.thread_id}}
+    for kind, payload in stream_turn(st.session_state.app, init_state, config):
+        if kind == "progress":
+            status.update(label=f"{payload}...")
+        elif kind == "token":
+            streamed += payload
+            yield payload
+        else:
+            response = payload["answer"]
+            result["response"] = response
+            result["context"] = payload["state"].get("context", "")
+            # Cached answers and notes appended after generation arrive only here
+            if response.startswith(streamed):
+                if response[len(streamed):]:
+                    yield response[len(streamed):]
+            status.update(label=f"Answered in {payload['total']:.1f}s", state="complete")
+
 def render_chat_interface():
     """Render the chat interface with messages and input"""
     # Main content area with messages
@@ -51,8 +85,17 @@ def render_chat_interface():
         st.session_state.messages.append({"role": "user", "content": prompt})
         
         # Get response
-        with st.spinner("Searching policies..."):
-            response, context = process_query(prompt)
+        if STREAMING:
+            with st.chat_message("user"):
+                st.markdown(prompt)
+            with st.chat_message("assistant"):
+                status = st.status("Searching policies...")
+                result = {}
+                st.write_stream(stream_query(prompt, status, result))
+            response, context = result["response"], result["context"]
+        else:
+            with st.spinner("Searching policies..."):
+                response, context = process_query(prompt)
         
         # Add assistant response with context
         st.session_state.messages.append({
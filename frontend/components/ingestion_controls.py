@@ -3,14 +3,9 @@ from pathlib import Path
 from pipeline.utils.document_tracker import DocumentTracker
 from pipeline.storage.vector_store import VectorStore
 from pipeline.storage.document_store import DocumentStore
-from pipeline.ingestion.loader import DocumentLoader
-from pipeline.ingestion.processor import DocumentProcessor
 from common.config import load_config
 from typing import Optional
 
-# Load configuration
-config = load_config()
-
 def process_uploaded_file(
     uploaded_file,
     doc_store: DocumentStore,
@@ -18,6 +13,12 @@ def process_uploaded_file(
     tracker: DocumentTracker
 ) -> bool:
     """Process a single uploaded file"""
+    from pipeline.ingestion.loader import DocumentLoader
+    from pipeline.ingestion.processor import DocumentProcessor
+    from pipeline.ingestion.streaming import streaming_config
+    from pipeline.ingestion.versioning import VersionPlanner
+
+    config = load_config()
     try:
         # Create temp directory if not exists
         temp_dir = Path(config["storage"]["temp_dir"])
@@ -36,15 +37,27 @@ def process_uploaded_file(
             chunk_overlap=config["processing"]["chunk_overlap"]
         )
         
-        # Load documents
-        documents = loader.load_documents(temp_dir.parent)
-        
-        if not documents:
-            st.error(f"No content extracted from {uploaded_file.name}")
-            return False
+        # A re-upload only stores changed chunks and drops the ones its previous version no longer has
+        planner = VersionPlanner(tracker, vector_store.db, config)
+        if streaming_config(config)["enabled"]:
+            # Pages flow straight into the vector store
+            registered = processor.process_stream(loader.iter_documents(temp_dir.parent), select=planner.select)
+            success = bool(registered)
+        else:
+            # Load documents
+            documents, registered = loader.load_documents(temp_dir.parent)
             
-        # Process and add to vector store
-        success = processor.process_documents(documents)
+            if not documents:
+                st.error(f"No content extracted from {uploaded_file.name}")
+                return False
+                
+            # Process and add to vector store
+            success = processor.process_documents(
+                documents, select=lambda chunks: planner.select_all(registered, chunks)
+            )
+        if success:
+            planner.remove_superseded()
+            tracker.register_documents(registered, chunk_ids=planner.chunk_ids)
         
         # Cleanup
         temp_path.unlink()
@@ -0,0 +1,114 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Follow-ups that lean on earlier turns ("who owns it?") must not be answered
+# from a cache entry produced in a different conversation.
+_REFERENTIAL_RE = re.compile(r"\b(it|its|this|that|these|those|they|them|their|above|previous)\b", re.I)
+
+def is_cacheable_query(query: str, has_history: bool) -> bool:
+    """Return True if the query can be answered independently of the conversation"""
+    if not query.strip():
+        return False
+    return not (has_history and _REFERENTIAL_RE.search(query))
+
+class SemanticAnswerCache:
+    """
+    Cache of final answers keyed by query embedding.
+
+    A lookup hits when a cached query for the same corpus version has cosine
+    similarity >= threshold. Entries for older corpus versions are never served.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000, ttl_seconds: float = 86400):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # corpus_version -> OrderedDict[query, (unit vector, answer, context, stored_at)]
+        self._entries: Dict[int, "OrderedDict[str, Tuple[np.ndarray, str, str, float]]"] = {}
+        self._matrix: Dict[int, Tuple[np.ndarray, List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _drop_stale_versions(self, corpus_version: int) -> None:
+        for version in [v for v in self._entries if v != corpus_version]:
+            del self._entries[version]
+            self._matrix.pop(version, None)
+
+    def _get_matrix(self, corpus_version: int) -> Tuple[np.ndarray, List[str]]:
+        cached = self._matrix.get(corpus_version)
+        if cached is None:
+            entries = self._entries.get(corpus_version, {})
+            keys = list(entries.keys())
+            mat = np.stack([entries[k][0] for k in keys]) if keys else np.empty((0, 0), np.float32)
+            cached = (mat, keys)
+            self._matrix[corpus_version] = cached
+        return cached
+
+    def lookup(self, embedding: List[float], corpus_version: int) -> Optional[Dict[str, object]]:
+        """Return {"answer", "context", "similarity"} for a hit, else None"""
+        q = self._unit(embedding)
+        with self._lock:
+            self._drop_stale_versions(corpus_version)
+            mat, keys = self._get_matrix(corpus_version)
+            if not keys:
+                self.misses += 1
+                return None
+            sims = mat @ q
+            idx = int(np.argmax(sims))
+            entries = self._entries[corpus_version]
+            _, answer, context, stored_at = entries[keys[idx]]
+            if sims[idx] < self.threshold or time.time() - stored_at > self.ttl_seconds:
+                self.misses += 1
+                return None
+            entries.move_to_end(keys[idx])
+            self.hits += 1
+            return {"answer": answer, "context": context, "similarity": float(sims[idx])}
+
+    def store(self, query: str, embedding: List[float], answer: str, context: str, corpus_version: int) -> None:
+        with self._lock:
+            self._drop_stale_versions(corpus_version)
+            entries = self._entries.setdefault(corpus_version, OrderedDict())
+            entries[query] = (self._unit(embedding), answer, context, time.time())
+            entries.move_to_end(query)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._matrix.pop(corpus_version, None)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": sum(len(e) for e in self._entries.values()),
+        }
+
+_CACHE: Optional[SemanticAnswerCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_answer_cache(cfg: dict) -> Optional[SemanticAnswerCache]:
+    """Return the process-wide answer cache, or None if disabled in config"""
+    global _CACHE
+    cache_cfg = cfg.get("cache", {}).get("answers", {})
+    if not cache_cfg.get("enabled", False):
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = SemanticAnswerCache(
+                    threshold=cache_cfg.get("similarity_threshold", 0.95),
+                    max_entries=cache_cfg.get("max_entries", 1000),
+                    ttl_seconds=cache_cfg.get("ttl_seconds", 86400),
+                )
+    return _CACHE
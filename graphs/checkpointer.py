@@ -0,0 +1,142 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from common.logger_util import get_logger
+
+logger = get_logger()
+
+class PrunedSqliteSaver(SqliteSaver):
+    """
+    SQLite checkpointer that keeps only the newest `keep_last` checkpoints per
+    thread and drops threads idle for longer than `ttl_seconds`.
+
+    Checkpoints hold the full channel values, so the latest one is enough to
+    resume a conversation; older ones only serve time travel. Async methods run
+    the sync implementation in a worker thread (the connection is lock-guarded).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, keep_last: int = 10, ttl_seconds: float = 0, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.keep_last = max(1, keep_last)
+        self.ttl_seconds = ttl_seconds
+        self._last_ttl_sweep = 0.0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_activity ("
+            "thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_activity (thread_id, updated_at) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            self._prune_thread(cur, thread_id, checkpoint_ns)
+        self.prune_idle_threads()
+        return saved
+
+    def _prune_thread(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str) -> None:
+        cur.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last),
+        )
+        stale = [(thread_id, checkpoint_ns, row[0]) for row in cur.fetchall()]
+        if checkpoint_ns == "":
+            # A root checkpoint is written between steps, so subgraph runs (the ReAct
+            # agent's own namespace) have finished and their checkpoints are dead weight
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns != ''", (thread_id,))
+            cur.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns != ''", (thread_id,))
+        if not stale:
+            return
+        cur.executemany(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", stale
+        )
+        cur.executemany(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", stale
+        )
+
+    def prune_idle_threads(self, force: bool = False) -> int:
+        """Delete threads idle longer than ttl_seconds (swept at most once a minute)"""
+        now = time.time()
+        if not self.ttl_seconds or (not force and now - self._last_ttl_sweep < 60):
+            return 0
+        self._last_ttl_sweep = now
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT thread_id FROM thread_activity WHERE updated_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            idle = [row[0] for row in cur.fetchall()]
+            for thread_id in idle:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        if idle:
+            logger.info(f"Checkpointer: removed {len(idle)} idle thread(s)")
+        return len(idle)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_lock = threading.Lock()
+
+def get_checkpointer(cfg: dict) -> BaseCheckpointSaver:
+    """Process-wide checkpointer shared by every compiled graph (one SQLite connection)"""
+    global _checkpointer
+    if _checkpointer is None:
+        with _lock:
+            if _checkpointer is None:
+                cp_cfg = cfg.get("checkpointer", {})
+                if cp_cfg.get("backend", "memory") == "sqlite":
+                    path = Path(cp_cfg.get("path", "data/checkpoints.sqlite"))
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(str(path), check_same_thread=False)
+                    saver = PrunedSqliteSaver(
+                        conn,
+                        keep_last=cp_cfg.get("keep_last", 10),
+                        ttl_seconds=cp_cfg.get("ttl_hours", 0) * 3600,
+                    )
+                    saver.prune_idle_threads(force=True)
+                    logger.info(f"Using SQLite checkpointer at {path}")
+                    _checkpointer = saver
+                else:
+                    _checkpointer = MemorySaver()
+    return _checkpointer
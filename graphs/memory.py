@@ -0,0 +1,90 @@
+from typing import List, Optional, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from graphs.retrieval.packer import estimate_tokens
+
+Turn = Tuple[str, str]  # (user question, final assistant answer)
+
+def memory_cfg(cfg: dict) -> dict:
+    return cfg.get("memory", {})
+
+def completed_turns(messages: List[BaseMessage], include_last: bool = False) -> List[Turn]:
+    """
+    Pair each question with its final answer. The last question is the turn being
+    answered now and is only included when include_last is set (after generate).
+    Agent tool-call messages and tool results are not part of the remembered history.
+    """
+    turns: List[Turn] = []
+    question: Optional[str] = None
+    answer: Optional[str] = None
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            if question is not None and answer is not None:
+                turns.append((question, answer))
+            question, answer = msg.content, None
+        elif isinstance(msg, AIMessage) and msg.content and not msg.tool_calls:
+            answer = msg.content
+    if include_last and question is not None and answer is not None:
+        turns.append((question, answer))
+    return turns
+
+def format_turns(turns: List[Turn]) -> str:
+    return "\n".join(f"User: {q}\nAssistant: {a}" for q, a in turns)
+
+def recent_turns(turns: List[Turn], summarized: int, cfg: dict) -> List[Turn]:
+    """Unsummarized turns, newest last, capped at keep_turns and the history token budget"""
+    mem = memory_cfg(cfg)
+    budget = mem.get("history_token_budget", 800)
+    chars_per_token = cfg["retrieval"].get("context", {}).get("chars_per_token", 4.0)
+
+    window = turns[summarized:][-mem.get("keep_turns", 4):]
+    kept, used = [], 0
+    for turn in reversed(window):
+        cost = estimate_tokens(format_turns([turn]), chars_per_token)
+        if kept and used + cost > budget:
+            break
+        kept.append(turn)
+        used += cost
+    return list(reversed(kept))
+
+def turns_to_fold(turns: List[Turn], summarized: int, cfg: dict) -> List[Turn]:
+    """Oldest unsummarized turns that no longer fit in the verbatim window"""
+    keep = len(recent_turns(turns, summarized, cfg))
+    return turns[summarized:len(turns) - keep]
+
+def history_block(summary: str, turns: List[Turn]) -> str:
+    """Previous Context for prompts: running summary, then recent turns verbatim"""
+    parts = []
+    if summary:
+        parts.append(f"Summary of earlier conversation:\n{summary}")
+    if turns:
+        parts.append(format_turns(turns))
+    return "\n\n".join(parts)
+
+def history_messages(turns: List[Turn]) -> List[BaseMessage]:
+    """Recent turns as chat messages for the agent (the summary goes in its system prompt)"""
+    msgs: List[BaseMessage] = []
+    for question, answer in turns:
+        msgs.extend([HumanMessage(content=question), AIMessage(content=answer)])
+    return msgs
+
+def summary_prompt(summary: str, turns: List[Turn], max_tokens: int) -> List[BaseMessage]:
+    """Prompt that folds new turns into the existing summary"""
+    sys = SystemMessage(content=(
+        "You maintain a running summary of a conversation with a policy assistant.\n"
+        "Update the summary with the new turns. Keep policy names, owners, dates and "
+        "decisions the user may refer back to; drop pleasantries and repetition.\n"
+        f"Reply with the updated summary only, in at most {max_tokens * 3 // 4} words."
+    ))
+    human = HumanMessage(content=(
+        f"[Current Summary]\n{summary or '(empty)'}\n\n[New Turns]\n{format_turns(turns)}"
+    ))
+    return [sys, human]
+
+def truncate_summary(text: str, max_tokens: int, chars_per_token: float = 4.0) -> str:
+    """Keep the newest part of the summary within max_tokens"""
+    limit = int(max_tokens * chars_per_token)
+    return text if len(text) <= limit else text[-limit:]
+
+def prompt_tokens(messages: List[BaseMessage], chars_per_token: float = 4.0) -> int:
+    """Estimated prompt size of a list of chat messages"""
+    return sum(estimate_tokens(str(m.content), chars_per_token) for m in messages)
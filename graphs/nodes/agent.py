@@ -1,32 +1,64 @@
-from langchain_core.messages import SystemMessage, ToolMessage
+import threading
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 from langgraph.prebuilt import create_react_agent
 from ..tools.metadata_tool import lookup_policy_metadata
+from common import telemetry
+from common.config import get_config
 from common.llm import get_llm
-from common.logger_util import init_logger
+from common.logger_util import get_logger
+from graphs.memory import completed_turns, history_messages, prompt_tokens, recent_turns
 
-logger, _ = init_logger()
+logger = get_logger()
 
 # Define tools list
 TOOLS = [lookup_policy_metadata]
 
-def agent_node(state):
-    """Run ReAct agent; store tool output if called."""
-    logger.debug("----- NODE CALL: agent_node -----")
-    llm = get_llm()
-    agent = create_react_agent(llm, TOOLS)  # Changed from _TOOLS to TOOLS
+_agent = None
+_agent_lock = threading.Lock()
+
+def get_agent():
+    """Compile the ReAct agent once per process; the per-turn context goes in the messages."""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = create_react_agent(get_llm(), TOOLS)
+    return _agent
 
+def _agent_input(state) -> dict:
+    config = get_config()
+    summary = state.get("summary", "")
+    summary_section = f"\nSummary of earlier conversation:\n{summary}\n" if summary else ""
     sys = SystemMessage(content=(
         "You are a helpful policy assistant. Use retrieved context to answer.\n"
         "For questions about policy ownership, status, managers, or review cycle, "
         "use the lookup_policy_metadata tool.\n"
         "Consider the conversation history for follow-up questions about specific policies.\n"
         "Do not fabricate metadata. Keep answers concise and accurate.\n\n"
-        f"Retrieved context:\n{state['context']}\n"
+        f"Retrieved context:\n{state['context']}\n{summary_section}"
     ))
-    
-    agent_messages = [sys] + state["messages"]
-    result = agent.invoke({"messages": agent_messages})
-    new_messages = result["messages"]
+
+    # Bounded history instead of the full transcript: summary + recent turns + this question
+    messages = state["messages"]
+    turns = recent_turns(completed_turns(messages), state.get("summarized_turns", 0), config)
+    user_msgs = [m for m in messages if isinstance(m, HumanMessage)]
+    agent_messages = [sys] + history_messages(turns) + user_msgs[-1:]
+
+    chars_per_token = config["retrieval"].get("context", {}).get("chars_per_token", 4.0)
+    tokens = prompt_tokens(agent_messages, chars_per_token)
+    logger.info(f"Agent prompt size: ~{tokens} tokens")
+    telemetry.record(prompt_tokens=tokens)
+    telemetry.count("prompt_tokens", tokens, node="agent")
+    return {"messages": agent_messages}
+
+def _agent_output(state, agent_input, result) -> dict:
+    # Only the messages the agent produced; its input is rebuilt from state every turn
+    new_messages = result["messages"][len(agent_input["messages"]):]
+
+    tool_names = [call["name"] for msg in new_messages for call in getattr(msg, "tool_calls", None) or []]
+    for name in tool_names:
+        telemetry.count("tool_calls", tool=name)
+    telemetry.record(tool_calls=tool_names, agent_messages=len(new_messages))
 
     tool_called = False
     metadata_text = state.get("metadata_text", "")
@@ -41,3 +73,17 @@ def agent_node(state):
         "metadata_text": metadata_text,
         "tool_called": tool_called or state.get("tool_called", False),
     }
+
+def agent_node(state):
+    """Run ReAct agent; store tool output if called."""
+    logger.debug("----- NODE CALL: agent_node -----")
+    agent_input = _agent_input(state)
+    result = get_agent().invoke(agent_input)
+    return _agent_output(state, agent_input, result)
+
+async def aagent_node(state):
+    """Async agent_node: the LLM round trips await instead of blocking the event loop."""
+    logger.debug("----- NODE CALL: aagent_node -----")
+    agent_input = _agent_input(state)
+    result = await get_agent().ainvoke(agent_input)
+    return _agent_output(state, agent_input, result)
@@ -0,0 +1,84 @@
+import asyncio
+from langchain_core.messages import HumanMessage, AIMessage
+from common import telemetry
+from common.config import get_config
+from common.resources import get_resources
+from common.logger_util import get_logger
+from graphs.answer_cache import get_answer_cache, is_cacheable_query
+from pipeline.corpus_version import get_corpus_version
+
+logger = get_logger()
+
+def _current_query(state) -> tuple[str, bool]:
+    user_msgs = [m for m in state["messages"] if isinstance(m, HumanMessage)]
+    if not user_msgs:
+        return "", False
+    return user_msgs[-1].content, len(user_msgs) > 1
+
+def cache_lookup_node(state):
+    """Serve a cached answer for a near-identical question on the same corpus version."""
+    config = get_config()
+    logger.debug("----- NODE CALL: cache_lookup_node -----")
+    corpus_version = get_corpus_version()
+    miss = {"cache_hit": False, "corpus_version": corpus_version}
+
+    cache = get_answer_cache(config)
+    query, has_history = _current_query(state)
+    if cache is None or not is_cacheable_query(query, has_history):
+        return miss
+
+    try:
+        embedding = get_resources().get_query_embeddings(config).embed_query(query)
+        hit = cache.lookup(embedding, corpus_version)
+    except Exception as e:
+        logger.error(f"Answer cache lookup failed: {e}")
+        return miss
+
+    telemetry.record(cache_hit=hit is not None)
+    telemetry.count("cache_lookups", cache="answers", result="hit" if hit is not None else "miss")
+    if hit is None:
+        return miss
+
+    logger.info(f"Answer cache hit (similarity={hit['similarity']:.3f}); skipping LLM calls")
+    logger.debug(f"Answer cache stats: {cache.stats()}")
+    return {
+        "messages": [AIMessage(content=hit["answer"])],
+        "context": hit["context"],
+        "cache_hit": True,
+        "corpus_version": corpus_version,
+    }
+
+def route_after_cache(state) -> str:
+    return "hit" if state.get("cache_hit") else "miss"
+
+def cache_store_node(state):
+    """Store the generated answer under the corpus version it was retrieved against."""
+    config = get_config()
+    logger.debug("----- NODE CALL: cache_store_node -----")
+    cache = get_answer_cache(config)
+    query, has_history = _current_query(state)
+    if cache is None or not is_cacheable_query(query, has_history):
+        return {}
+
+    ai_msgs = [m for m in state["messages"] if isinstance(m, AIMessage)]
+    if not ai_msgs:
+        return {}
+
+    try:
+        embedding = get_resources().get_query_embeddings(config).embed_query(query)
+        cache.store(
+            query,
+            embedding,
+            ai_msgs[-1].content,
+            state.get("context", ""),
+            state.get("corpus_version", get_corpus_version()),
+        )
+    except Exception as e:
+        logger.error(f"Answer cache store failed: {e}")
+    return {}
+
+async def acache_lookup_node(state):
+    return await asyncio.to_thread(cache_lookup_node, state)
+
+async def acache_store_node(state):
+    return await asyncio.to_thread(cache_store_node, state)
@@ -1,25 +1,26 @@
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from common import telemetry
+from common.config import get_config
 from common.llm import get_llm
-from common.logger_util import init_logger
+from common.logger_util import get_logger
+from graphs.memory import completed_turns, history_block, prompt_tokens, recent_turns
 
-logger, _ = init_logger()
-
-def generate_node(state):
-    """Compose final answer from retrieved context + optional metadata."""
-    logger.debug("----- NODE CALL: generate_node -----")
-    llm = get_llm()
+logger = get_logger()
 
+def _build_prompt(state) -> tuple[list, bool]:
+    """Return the LLM messages and whether any context/metadata was available."""
+    config = get_config()
     # Get conversation history
     messages = state["messages"]
     user_messages = [m for m in messages if isinstance(m, HumanMessage)]
     current_query = user_messages[-1].content if user_messages else ""
     
-    # Get previous context if any
-    previous_context = ""
-    if len(user_messages) > 1:
-        previous_responses = [m for m in messages if isinstance(m, AIMessage)]
-        if previous_responses:
-            previous_context = "\n".join([r.content for r in previous_responses[:-1]])
+    # Previous context: running summary + the last few turns, within the history budget
+    turns = completed_turns(messages)
+    previous_context = history_block(
+        state.get("summary", ""),
+        recent_turns(turns, state.get("summarized_turns", 0), config),
+    )
 
     meta_block = state.get("metadata_text", "").strip()
     meta_section = f"\n\n[Metadata]\n{meta_block}" if meta_block else ""
@@ -36,11 +37,46 @@ def generate_node(state):
     ))
     
     human = HumanMessage(content=current_query)
-    resp: AIMessage = llm.invoke([sys, human])
-    
+    return [sys, human], bool(context_block or meta_block)
+
+def _report_prompt_size(prompt: list) -> int:
+    config = get_config()
+    chars_per_token = config["retrieval"].get("context", {}).get("chars_per_token", 4.0)
+    tokens = prompt_tokens(prompt, chars_per_token)
+    logger.info(f"Generate prompt size: ~{tokens} tokens")
+    return tokens
+
+def _completion_tokens(resp: AIMessage) -> int:
+    config = get_config()
+    usage = getattr(resp, "usage_metadata", None) or {}
+    if usage.get("output_tokens"):
+        return usage["output_tokens"]
+    return prompt_tokens([resp], config["retrieval"].get("context", {}).get("chars_per_token", 4.0))
+
+def _format_response(resp: AIMessage, has_evidence: bool, tokens: int) -> dict:
+    completion = _completion_tokens(resp)
+    telemetry.record(prompt_tokens=tokens, completion_tokens=completion, has_evidence=has_evidence)
+    telemetry.count("prompt_tokens", tokens, node="generate")
+    telemetry.count("completion_tokens", completion, node="generate")
     # Format response with markdown
     response_text = resp.content
-    if not context_block and not meta_block:
+    if not has_evidence:
         response_text += "\n\n*Note: No relevant information was found in the policy documents.*"
         
-    return {"messages": [AIMessage(content=response_text)]}
+    return {"messages": [AIMessage(content=response_text)], "prompt_tokens": tokens}
+
+def generate_node(state):
+    """Compose final answer from retrieved context + optional metadata."""
+    logger.debug("----- NODE CALL: generate_node -----")
+    prompt, has_evidence = _build_prompt(state)
+    tokens = _report_prompt_size(prompt)
+    resp: AIMessage = get_llm().invoke(prompt)
+    return _format_response(resp, has_evidence, tokens)
+
+async def agenerate_node(state):
+    """Async generate_node."""
+    logger.debug("----- NODE CALL: agenerate_node -----")
+    prompt, has_evidence = _build_prompt(state)
+    tokens = _report_prompt_size(prompt)
+    resp: AIMessage = await get_llm().ainvoke(prompt)
+    return _format_response(resp, has_evidence, tokens)
@@ -0,0 +1,42 @@
+import asyncio
+from common import telemetry
+from common.config import get_config
+from common.llm import get_llm
+from common.logger_util import get_logger
+from graphs.memory import (
+    completed_turns, memory_cfg, summary_prompt, truncate_summary, turns_to_fold, format_turns,
+)
+
+logger = get_logger()
+
+def _fold(summary: str, turns, mem: dict, chars_per_token: float) -> str:
+    max_tokens = mem.get("summary_token_budget", 300)
+    if mem.get("summarize", True):
+        try:
+            resp = get_llm().invoke(summary_prompt(summary, turns, max_tokens))
+            return truncate_summary(resp.content.strip(), max_tokens, chars_per_token)
+        except Exception as e:
+            logger.error(f"Conversation summary update failed, keeping raw turns: {e}")
+    merged = "\n".join(part for part in (summary, format_turns(turns)) if part)
+    return truncate_summary(merged, max_tokens, chars_per_token)
+
+def update_memory_node(state):
+    """Fold turns that fell out of the verbatim window into the running summary."""
+    config = get_config()
+    logger.debug("----- NODE CALL: update_memory_node -----")
+    mem = memory_cfg(config)
+    chars_per_token = config["retrieval"].get("context", {}).get("chars_per_token", 4.0)
+    summarized = state.get("summarized_turns", 0)
+    turns = completed_turns(state["messages"], include_last=True)
+
+    fold = turns_to_fold(turns, summarized, config)
+    if not fold:
+        return {}
+
+    summary = _fold(state.get("summary", ""), fold, mem, chars_per_token)
+    telemetry.record(folded_turns=len(fold), summary_chars=len(summary))
+    logger.info(f"Memory: folded {len(fold)} turn(s) into summary ({summarized + len(fold)} summarized)")
+    return {"summary": summary, "summarized_turns": summarized + len(fold)}
+
+async def aupdate_memory_node(state):
+    return await asyncio.to_thread(update_memory_node, state)
@@ -0,0 +1,45 @@
+import asyncio
+from langchain_core.messages import HumanMessage
+from common.config import get_config
+from common.logger_util import get_logger
+from graphs.retrieval.filters import extract_constraints
+from graphs.tools.metadata_store import get_metadata_store
+from graphs.tools.metadata_tool import lookup_policy_metadata
+
+logger = get_logger()
+
+def _latest_query(state) -> str:
+    user_msgs = [m for m in state["messages"] if isinstance(m, HumanMessage)]
+    return user_msgs[-1].content if user_msgs else ""
+
+def resolve_filters_node(state):
+    """
+    Match the query against the metadata store's policy titles and pull out
+    date constraints. Runs before retrieval and metadata prefetch fan out, so
+    retrieval can restrict its search to the policies the metadata names.
+    """
+    config = get_config()
+    logger.debug("----- NODE CALL: resolve_filters_node -----")
+    try:
+        constraints = extract_constraints(_latest_query(state), get_metadata_store(config).titles())
+    except Exception as e:
+        logger.error(f"Metadata title matching failed: {e}")
+        constraints = {}
+    return {"filters": constraints}
+
+async def aresolve_filters_node(state):
+    return resolve_filters_node(state)
+
+def prefetch_metadata_node(state):
+    """Look up metadata for policy titles named in the query (runs alongside retrieval)."""
+    logger.debug("----- NODE CALL: prefetch_metadata_node -----")
+    titles = (state.get("filters") or {}).get("titles", [])
+    if not titles:
+        return {"metadata_text": "", "metadata_prefetched": False}
+
+    logger.debug(f"Prefetching metadata for: {titles}")
+    lines = [lookup_policy_metadata.invoke(title) for title in titles]
+    return {"metadata_text": "\n".join(lines), "metadata_prefetched": True}
+
+async def aprefetch_metadata_node(state):
+    return await asyncio.to_thread(prefetch_metadata_node, state)
@@ -1,42 +1,179 @@
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage  # Add this import
-from common.config import load_config
-from common.logger_util import init_logger
+from common import telemetry
+from common.config import get_config
+from common.embedding_cache import embed_queries
+from common.resources import get_resources
+from graphs.retrieval.filters import extract_constraints, match_titles, to_where
+from graphs.retrieval.hybrid import dense_search, hybrid_search
+from graphs.retrieval.mmr import candidate_vectors, mmr_select
+from graphs.retrieval.packer import build_context
+from common.logger_util import get_logger
 
 # Initialize logger
-logger, _ = init_logger()
-
-# Load configuration
-config = load_config()
+logger = get_logger()
 
 def get_retriever():
-    """Initialize and return a Chroma retriever with configured embeddings"""
+    """Return a retriever backed by the process-wide embeddings and Chroma client"""
+    config = get_config()
     try:
-        embeddings = HuggingFaceEmbeddings(
-            model_name=config["vector_store"]["embedding_model"]
-        )
-        
-        vectordb = Chroma(
-            persist_directory=config["vector_store"]["persist_directory"],
-            embedding_function=embeddings,
-            collection_name=config["vector_store"]["collection_name"]
-        )
-        
-        return vectordb.as_retriever(
-            search_kwargs={"k": config["vector_store"]["top_k"]}
-        )
+        return get_resources().get_retriever(config)
     except Exception as e:
         logger.error(f"Failed to initialize retriever: {str(e)}")
         raise
 
+def _search_by_vectors(db, vectors: List[List[float]], k: int) -> List[List[Document]]:
+    """One multi-query search against the store; results in input order"""
+    if hasattr(db, "search_vectors"):
+        hits = db.search_vectors(vectors, k)
+        return [[db.document_at(row) for row, _ in per_query] for per_query in hits]
+    res = db._collection.query(
+        query_embeddings=vectors,
+        n_results=k,
+        include=["documents", "metadatas"],
+    )
+    return [
+        [Document(page_content=text, metadata=meta or {}, id=doc_id) for doc_id, text, meta in zip(ids, texts, metas)]
+        for ids, texts, metas in zip(res["ids"], res["documents"], res["metadatas"])
+    ]
+
+def batch_retrieve(
+    queries: List[str],
+    k: Optional[int] = None,
+    batch_size: int = 64,
+) -> Tuple[List[List[Document]], Dict[str, float]]:
+    """
+    Dense retrieval for many queries at once (evaluation runs, bulk FAQ generation).
+    Queries are encoded in batches the same way as single queries (through the
+    query embedding cache) and each batch is sent to the store as a single
+    multi-query search. Returns per-query results in input order plus
+    throughput stats.
+    """
+    config = get_config()
+    resources = get_resources()
+    k = k or config["vector_store"]["top_k"]
+    embeddings = resources.get_query_embeddings(config)
+    db = resources.get_vectordb(config)
+
+    results: List[List[Document]] = []
+    encode_s = search_s = 0.0
+    started = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        batch = queries[i:i + batch_size]
+        t0 = time.perf_counter()
+        vectors = embed_queries(embeddings, batch)
+        t1 = time.perf_counter()
+        results.extend(_search_by_vectors(db, vectors, k))
+        encode_s += t1 - t0
+        search_s += time.perf_counter() - t1
+    elapsed = time.perf_counter() - started
+
+    stats = {
+        "queries": len(queries),
+        "seconds": elapsed,
+        "queries_per_second": len(queries) / elapsed if elapsed else 0.0,
+        "encode_seconds": encode_s,
+        "search_seconds": search_s,
+    }
+    logger.info(
+        f"Batch retrieval: {len(queries)} queries in {elapsed:.2f}s "
+        f"({stats['queries_per_second']:.1f} q/s; encode {encode_s:.2f}s, search {search_s:.2f}s)"
+    )
+    return results, stats
+
+def resolve_constraints(query: str, provided: Optional[Dict] = None) -> Dict:
+    """
+    Title/date constraints for a query: extracted from the query text, plus any
+    `provided` in graph state (titles the metadata store matched, dates).
+    Titles are resolved against the title → chunk-id index so only titles that
+    exist in the store are kept.
+    """
+    config = get_config()
+    if not config["retrieval"].get("filters", {}).get("enabled", False):
+        return {}
+    title_index = get_resources().get_title_index(config)
+    known_titles = title_index.all_titles()
+    constraints = extract_constraints(query, known_titles)
+    if provided:
+        titles = set(constraints.get("titles", []))
+        titles.update(t for name in provided.get("titles", []) for t in match_titles(name, known_titles))
+        constraints["titles"] = sorted(titles)
+        for bound in ("date_from", "date_to"):
+            if provided.get(bound) and bound not in constraints:
+                constraints[bound] = provided[bound]
+    if "titles" in constraints and not constraints["titles"]:
+        del constraints["titles"]
+    return constraints
+
+def _restriction(constraints: Dict) -> Tuple[Optional[List[str]], Optional[dict]]:
+    """
+    (chunk ids, `where` filter) for the constraints. Named titles are resolved
+    to their chunk ids through the title index, so the store scores only those
+    chunks; the metadata filter then carries just the remaining (date) bounds.
+    """
+    config = get_config()
+    if constraints.get("titles"):
+        ids = get_resources().get_title_index(config).chunk_ids(constraints["titles"])
+        if ids:
+            logger.debug(f"Title filter {constraints['titles']} covers {len(ids)} chunks")
+            return ids, to_where({k: v for k, v in constraints.items() if k != "titles"})
+    return None, to_where(constraints)
+
+def _candidates(
+    query: str,
+    query_vec: List[float],
+    k: int,
+    where: Optional[dict],
+    ids: Optional[List[str]] = None,
+) -> List[Document]:
+    config = get_config()
+    if config["retrieval"]["hybrid"].get("enabled", False):
+        hits = hybrid_search(query, query_vec, config, k, where=where, ids=ids)
+    else:
+        hits = dense_search(get_resources().get_vectordb(config), query_vec, k, where=where, ids=ids)
+    telemetry.record(scores=[round(score, 5) for _, score in hits])
+    return [d for d, _ in hits]
+
+def search_documents(query: str, constraints: Optional[Dict] = None) -> List[Document]:
+    """
+    Retrieve top_k chunks for query: dense (or hybrid dense + BM25) candidates,
+    restricted to the metadata constraints when given, optionally over-fetched
+    and diversified with MMR.
+    """
+    config = get_config()
+    resources = get_resources()
+    top_k = config["vector_store"]["top_k"]
+    mmr_cfg = config["retrieval"].get("mmr", {})
+    use_mmr = mmr_cfg.get("enabled", False)
+    fetch_k = max(mmr_cfg.get("fetch_k", top_k), top_k) if use_mmr else top_k
+
+    query_vec = resources.get_query_embeddings(config).embed_query(query)
+    db = resources.get_vectordb(config)
+    ids, where = _restriction(constraints or {})
+    docs = _candidates(query, query_vec, fetch_k, where, ids)
+    if (where or ids) and not docs:
+        # Constraint matched nothing (e.g. chunks ingested before effective_ord existed)
+        logger.debug(f"No chunks matched filter {where} / {len(ids or [])} title chunks; retrying unfiltered")
+        docs = _candidates(query, query_vec, fetch_k, None)
+    telemetry.record(candidates=len(docs), filtered=bool(where or ids))
+
+    if use_mmr and len(docs) > top_k:
+        embeddings = resources.get_embeddings(config["vector_store"]["embedding_model"])
+        vecs = candidate_vectors(db, embeddings, docs)
+        picked = mmr_select(query_vec, vecs, top_k, mmr_cfg.get("lambda_mult", 0.5))
+        logger.debug(f"MMR kept candidates {picked} of {len(docs)}")
+        docs = [docs[i] for i in picked]
+    return docs[:top_k]
+
 def retrieve_node(state):
     """Retrieve relevant documents based on the latest user query"""
+    config = get_config()
     logger.debug("----- NODE CALL: retrieve_node -----")
     
     try:
-        retriever = get_retriever()
-        
         # Get the latest user message - fix the isinstance check
         user_msgs = [m for m in state["messages"] if isinstance(m, HumanMessage)]
         
@@ -47,20 +184,34 @@ def retrieve_node(state):
         user_query = user_msgs[-1].content
         logger.debug(f"Retrieving documents for query: {user_query}")
         
-        docs = retriever.invoke(user_query)
-        
-        # Prepare a compact context block
-        snippets = []
-        for d in docs:
-            src = d.metadata.get("source", "unknown").split('/')[-1]
-            text = d.page_content.replace("\n", " ")
-            snippets.append(f"[Source: {src}]\n{text}\n")
+        constraints = resolve_constraints(user_query, state.get("filters"))
+        if constraints:
+            logger.info(f"Retrieval constraints: {constraints}")
+        docs = search_documents(user_query, constraints)
         
-        context_block = "\n".join(snippets) if snippets else "No relevant chunks were found."
-        logger.debug(f"Retrieved {len(snippets)} relevant chunks")
+        # Stitch overlapping chunks and pack them into the token budget
+        context_block, context_tokens, n_spans = build_context(docs, config)
+        if not context_block:
+            context_block = "No relevant chunks were found."
+        logger.debug(f"Retrieved {len(docs)} relevant chunks")
+        logger.info(
+            f"Context packed: {n_spans} spans from {len(docs)} chunks, "
+            f"{context_tokens}/{config['retrieval'].get('context', {}).get('token_budget', 1500)} tokens"
+        )
+        telemetry.record(chunks=len(docs), spans=n_spans, context_tokens=context_tokens)
+        telemetry.count("retrieved_chunks", len(docs))
+        cache = get_resources().get_query_cache(config)
+        if cache is not None:
+            stats = cache.stats()
+            logger.debug(f"Query embedding cache: {stats}")
+            telemetry.record(query_cache_hit_rate=stats["hit_rate"])
         
-        return {"context": context_block}
+        return {"context": context_block, "context_tokens": context_tokens}
         
     except Exception as e:
         logger.error(f"Error in retrieve_node: {str(e)}")
         return {"context": "Error occurred during document retrieval"}
+
+async def aretrieve_node(state):
+    """Async retrieve_node: embedding and store I/O run in a worker thread."""
+    return await asyncio.to_thread(retrieve_node, state)
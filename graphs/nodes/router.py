@@ -0,0 +1,48 @@
+import re
+import threading
+from langchain_core.messages import HumanMessage
+from common.logger_util import get_logger
+
+logger = get_logger()
+
+# Questions the metadata tool can answer: ownership, status, managers, review cycle
+_TOOL_PATTERNS = re.compile(
+    r"\b("
+    r"own(s|ed|er|ers|ership)?|responsible|accountable|"
+    r"status|published|draft|retired|active|"
+    r"manag(e|es|ed|er|ers)|contact|approv(e|es|ed|er|al)|"
+    r"review(ed|s)?|review cycle|cadence|"
+    r"metadata"
+    r")\b",
+    re.I,
+)
+
+_stats_lock = threading.Lock()
+_stats = {"agent": 0, "generate": 0}
+
+def needs_tool(query: str) -> bool:
+    """Rule-based check: does the question ask for policy metadata?"""
+    return bool(_TOOL_PATTERNS.search(query or ""))
+
+def route_after_retrieve(state) -> str:
+    """Conditional edge: run the ReAct agent only when the metadata tool may be needed."""
+    user_msgs = [m for m in state["messages"] if isinstance(m, HumanMessage)]
+    query = user_msgs[-1].content if user_msgs else ""
+    route = "agent" if needs_tool(query) else "generate"
+    if route == "agent" and state.get("metadata_prefetched"):
+        # Metadata for the named policy is already in state; the tool call is redundant
+        route = "generate"
+
+    with _stats_lock:
+        _stats[route] += 1
+        total = _stats["agent"] + _stats["generate"]
+        skipped = _stats["generate"]
+    logger.info(
+        f"Router: {route} | agent skipped on {skipped}/{total} turns "
+        f"(~{skipped} agent LLM calls saved)"
+    )
+    return route
+
+def router_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
@@ -1,29 +1,106 @@
-import operator
+import threading
 from typing import Annotated, List, TypedDict
-from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
 from langchain_core.messages import AnyMessage
+from langchain_core.runnables import RunnableLambda
 
-from graphs.nodes.retrieve import retrieve_node
-from graphs.nodes.agent import agent_node
-from graphs.nodes.generate import generate_node
+from common import telemetry
+from common.config import load_config
+from graphs.checkpointer import get_checkpointer
+from graphs.nodes.cache import (
+    cache_lookup_node, acache_lookup_node, cache_store_node, acache_store_node, route_after_cache,
+)
+from graphs.nodes.retrieve import retrieve_node, aretrieve_node
+from graphs.nodes.metadata_prefetch import (
+    resolve_filters_node, aresolve_filters_node, prefetch_metadata_node, aprefetch_metadata_node,
+)
+from graphs.nodes.router import route_after_retrieve
+from graphs.nodes.agent import agent_node, aagent_node
+from graphs.nodes.generate import generate_node, agenerate_node
+from graphs.nodes.memory import update_memory_node, aupdate_memory_node
+from graphs.retrieval.filters import merge_filters
 
 class GraphState(TypedDict):
-    messages: Annotated[List[AnyMessage], operator.add]
+    # Appends new messages (replacing any with the same id); callers send only the new turn
+    messages: Annotated[List[AnyMessage], add_messages]
     context: str
+    context_tokens: int
     metadata_text: str
+    metadata_prefetched: bool
+    # Title/date constraints for this turn's retrieval; the turn input resets it with None
+    filters: Annotated[dict, merge_filters]
     tool_called: bool
+    cache_hit: bool
+    corpus_version: int
+    summary: str
+    summarized_turns: int
+    prompt_tokens: int
+
+def _node(name, func, afunc):
+    """Node usable from both invoke/stream and ainvoke/astream, timed as span node.<name>"""
+    span = telemetry.traced(f"node.{name}")
+    return RunnableLambda(span(func), afunc=span(afunc), name=func.__name__)
+
+def merge_node(state):
+    """Fan-in point: retrieval and metadata prefetch have both written to state."""
+    return {}
 
 def build_graph():
+    cfg = load_config()
+    use_answer_cache = cfg.get("cache", {}).get("answers", {}).get("enabled", False)
+    use_router = cfg.get("router", {}).get("enabled", False)
+
     g = StateGraph(GraphState)
-    g.add_node("retrieve", retrieve_node)
-    g.add_node("agent", agent_node)
-    g.add_node("generate", generate_node)
+    g.add_node("resolve_filters", _node("resolve_filters", resolve_filters_node, aresolve_filters_node))
+    g.add_node("retrieve", _node("retrieve", retrieve_node, aretrieve_node))
+    g.add_node("prefetch_metadata", _node("prefetch_metadata", prefetch_metadata_node, aprefetch_metadata_node))
+    g.add_node("merge", merge_node)
+    g.add_node("agent", _node("agent", agent_node, aagent_node))
+    g.add_node("generate", _node("generate", generate_node, agenerate_node))
+    g.add_node("memory", _node("memory", update_memory_node, aupdate_memory_node))
 
-    g.set_entry_point("retrieve")
-    g.add_edge("retrieve", "agent")
+    # Titles/dates are resolved first (in memory); retrieval and metadata
+    # prefetch are then independent: fan out, then join at merge
+    fan_out = ["retrieve", "prefetch_metadata"]
+    if use_answer_cache:
+        g.add_node("cache_lookup", _node("cache_lookup", cache_lookup_node, acache_lookup_node))
+        g.add_node("cache_store", _node("cache_store", cache_store_node, acache_store_node))
+        g.add_edge(START, "cache_lookup")
+        g.add_conditional_edges(
+            "cache_lookup",
+            lambda state: END if route_after_cache(state) == "hit" else "resolve_filters",
+            ["resolve_filters", END],
+        )
+    else:
+        g.add_edge(START, "resolve_filters")
+    for node in fan_out:
+        g.add_edge("resolve_filters", node)
+    g.add_edge(fan_out, "merge")
+
+    if use_router:
+        # Skip the ReAct agent (one LLM loop) when no metadata tool call is needed
+        g.add_conditional_edges("merge", route_after_retrieve, {"agent": "agent", "generate": "generate"})
+    else:
+        g.add_edge("merge", "agent")
     g.add_edge("agent", "generate")
-    g.add_edge("generate", END)
+    g.add_edge("generate", "memory")
+    if use_answer_cache:
+        g.add_edge("memory", "cache_store")
+        g.add_edge("cache_store", END)
+    else:
+        g.add_edge("memory", END)
+
+    return g.compile(checkpointer=get_checkpointer(cfg))
+
+_graph = None
+_graph_lock = threading.Lock()
 
-    memory = MemorySaver()
-    return g.compile(checkpointer=memory)
+def get_graph():
+    """Compiled graph shared by every session in the process (built on first use)"""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_graph()
+    return _graph
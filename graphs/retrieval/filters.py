@@ -0,0 +1,83 @@
+import re
+from typing import Dict, List, Optional
+
+_GENERIC_WORDS = {"policy", "policies", "procedure", "standard", "guideline", "the", "and", "of", "for", "a", "an"}
+_ISO_DATE = r"(\d{4})(?:-(\d{2})-(\d{2}))?"
+_AFTER_RE = re.compile(rf"\b(?:after|since|from|effective)\s+{_ISO_DATE}\b", re.I)
+_BEFORE_RE = re.compile(rf"\b(?:before|until|prior to)\s+{_ISO_DATE}\b", re.I)
+_IN_YEAR_RE = re.compile(r"\b(?:in|during)\s+(\d{4})\b", re.I)
+
+def normalize_title(text: str) -> str:
+    text = re.sub(r"[_\-]+", " ", (text or "").lower())
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def match_titles(query: str, titles: List[str]) -> List[str]:
+    """
+    Titles named by the query: either the full normalized title appears in the
+    query, or every distinctive word of the title does.
+    """
+    q = normalize_title(query)
+    q_words = set(q.split())
+    matched = []
+    for title in titles:
+        t = normalize_title(title)
+        if not t:
+            continue
+        distinctive = set(t.split()) - _GENERIC_WORDS
+        if f" {t} " in f" {q} " or (distinctive and distinctive <= q_words):
+            matched.append(title)
+    return matched
+
+def _date_ord(year: str, month: Optional[str], day: Optional[str], end: bool) -> int:
+    if month and day:
+        return int(f"{year}{month}{day}")
+    return int(f"{year}1231") if end else int(f"{year}0101")
+
+def extract_constraints(query: str, titles: List[str]) -> Dict[str, object]:
+    """Pull policy-title and effective-date constraints out of a free-text query"""
+    constraints: Dict[str, object] = {}
+    matched = match_titles(query, titles)
+    if matched:
+        constraints["titles"] = matched
+
+    m = _AFTER_RE.search(query)
+    if m:
+        constraints["date_from"] = _date_ord(*m.groups(), end=False)
+    m = _BEFORE_RE.search(query)
+    if m:
+        constraints["date_to"] = _date_ord(*m.groups(), end=True)
+    m = _IN_YEAR_RE.search(query)
+    if m and "date_from" not in constraints and "date_to" not in constraints:
+        constraints["date_from"] = _date_ord(m.group(1), None, None, end=False)
+        constraints["date_to"] = _date_ord(m.group(1), None, None, end=True)
+    return constraints
+
+def to_where(constraints: Dict[str, object]) -> Optional[dict]:
+    """Translate constraints into a Chroma-style `where` filter (None if unconstrained)"""
+    clauses = []
+    if constraints.get("titles"):
+        clauses.append({"title": {"$in": list(constraints["titles"])}})
+    if constraints.get("date_from"):
+        clauses.append({"effective_ord": {"$gte": int(constraints["date_from"])}})
+    if constraints.get("date_to"):
+        clauses.append({"effective_ord": {"$lte": int(constraints["date_to"])}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def merge_filters(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    """
+    Reducer for the graph's `filters` state: None clears it (each turn's input
+    does), otherwise named titles are unioned and date bounds narrowed.
+    """
+    if right is None:
+        return {}
+    merged = dict(left or {})
+    if right.get("titles"):
+        merged["titles"] = sorted(set(merged.get("titles", [])) | set(right["titles"]))
+    if right.get("date_from"):
+        merged["date_from"] = max(merged.get("date_from", 0), right["date_from"])
+    if right.get("date_to"):
+        merged["date_to"] = min(merged.get("date_to", right["date_to"]), right["date_to"])
+    return merged
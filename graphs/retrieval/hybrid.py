@@ -0,0 +1,97 @@
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from common.resources import get_resources
+
+def doc_key(doc: Document) -> str:
+    """Identity of a chunk across retrievers (same source, page and text)"""
+    meta = doc.metadata
+    raw = f"{meta.get('source', '')}|{meta.get('page', '')}|{doc.page_content}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[List[Document]],
+    weights: Sequence[float],
+    k: int,
+    rrf_k: int = 60,
+) -> List[Tuple[Document, float]]:
+    """
+    Fuse several rankings: score(d) = sum_i w_i / (rrf_k + rank_i(d)).
+    Returns the top-k (Document, fused score) pairs.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for ranking, weight in zip(ranked_lists, weights):
+        if not weight:
+            continue
+        for rank, doc in enumerate(ranking, start=1):
+            key = doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + weight / (rrf_k + rank)
+    ordered = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+    return [(docs[key], score) for key, score in ordered]
+
+def dense_search(
+    db,
+    query_vec: List[float],
+    k: int,
+    where: Optional[dict] = None,
+    ids: Optional[List[str]] = None,
+) -> List[Tuple[Document, float]]:
+    """
+    Top-k (Document, relevance score) pairs by vector similarity, optionally
+    metadata-filtered; higher scores are better (cosine similarity, or
+    Chroma's relevance for its distance metric). With `ids` (e.g. from the
+    title → chunk-id index) only those chunks are scored: the NumPy store
+    scans just their rows, and for Chroma their stored embeddings are fetched
+    by id and ranked here.
+    """
+    numpy_store = hasattr(db, "search_vectors")
+    if ids is None:
+        if numpy_store:
+            return db.similarity_search_by_vector_with_score(query_vec, k=k, filter=where)
+        relevance = db._select_relevance_score_fn()
+        hits = db.similarity_search_by_vector_with_relevance_scores(query_vec, k=k, filter=where)
+        return [(doc, relevance(distance)) for doc, distance in hits]
+    if numpy_store:
+        rows = db.rows_for_ids(ids)
+        if where:
+            rows = np.intersect1d(rows, db.rows_for_filter(where))
+        return [(db.document_at(row), score) for row, score in db.search_vectors(np.asarray([query_vec]), k, rows=rows)[0]]
+
+    res = db.get(ids=ids, where=where, include=["embeddings", "documents", "metadatas"])
+    if not len(res["ids"]):
+        return []
+    vecs = np.asarray(res["embeddings"], dtype=np.float32)
+    vecs /= np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vec, dtype=np.float32)
+    sims = vecs @ (query / max(float(np.linalg.norm(query)), 1e-12))
+    top = np.argsort(-sims)[:k]
+    return [
+        (Document(page_content=res["documents"][i], metadata=res["metadatas"][i] or {}, id=res["ids"][i]), float(sims[i]))
+        for i in top
+    ]
+
+def hybrid_search(
+    query: str,
+    query_vec: List[float],
+    cfg: dict,
+    k: int,
+    where: Optional[dict] = None,
+    ids: Optional[List[str]] = None,
+) -> List[Tuple[Document, float]]:
+    """Dense (vector store) + lexical (BM25) retrieval combined with RRF"""
+    hybrid_cfg = cfg["retrieval"]["hybrid"]
+    fetch_k = max(hybrid_cfg.get("fetch_k", k), k)
+    resources = get_resources()
+
+    dense = [doc for doc, _ in dense_search(resources.get_vectordb(cfg), query_vec, fetch_k, where=where, ids=ids)]
+    lexical = [doc for doc, _ in resources.get_lexical_index(cfg).search(query, k=fetch_k, where=where, ids=ids)]
+
+    return reciprocal_rank_fusion(
+        [dense, lexical],
+        [hybrid_cfg.get("dense_weight", 1.0), hybrid_cfg.get("lexical_weight", 1.0)],
+        k=k,
+        rrf_k=hybrid_cfg.get("rrf_k", 60),
+    )
@@ -0,0 +1,58 @@
+from typing import List, Sequence
+import numpy as np
+from langchain_core.documents import Document
+
+def mmr_select(query_vec: Sequence[float], cand_vecs: np.ndarray, k: int, lambda_mult: float = 0.5) -> List[int]:
+    """
+    Maximal marginal relevance over candidate embeddings.
+
+    score(i) = lambda * sim(q, c_i) - (1 - lambda) * max_{j in selected} sim(c_i, c_j)
+
+    Candidate-candidate similarities come from one matrix product; each greedy
+    step only updates the running max-similarity vector.
+    """
+    cand = np.asarray(cand_vecs, dtype=np.float32)
+    n = cand.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    cand = cand / np.maximum(np.linalg.norm(cand, axis=1, keepdims=True), 1e-12)
+    q = np.asarray(query_vec, dtype=np.float32)
+    q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+    relevance = cand @ q
+    pairwise = cand @ cand.T
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    for _ in range(min(k, n)):
+        penalty = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * penalty
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_sim = np.maximum(max_sim, pairwise[:, best])
+    return selected
+
+def candidate_vectors(db, embeddings, docs: List[Document]) -> np.ndarray:
+    """
+    Stored embeddings for candidate chunks, looked up by id from the vector store.
+    Chunks the store cannot resolve are re-encoded with the document encoder.
+    """
+    ids = [d.id for d in docs if d.id]
+    found = {}
+    if ids:
+        if hasattr(db, "get_vectors_by_id"):
+            found = db.get_vectors_by_id(ids)
+        else:
+            res = db.get(ids=ids, include=["embeddings"])
+            found = dict(zip(res["ids"], res["embeddings"]))
+
+    missing = [i for i, d in enumerate(docs) if d.id not in found]
+    encoded = embeddings.embed_documents([docs[i].page_content for i in missing]) if missing else []
+    extra = dict(zip(missing, encoded))
+    return np.asarray(
+        [extra[i] if i in extra else found[d.id] for i, d in enumerate(docs)],
+        dtype=np.float32,
+    )
@@ -0,0 +1,124 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+
+@dataclass
+class Span:
+    source: str
+    page: Optional[int]
+    text: str
+    score: float
+    start: Optional[int] = None
+    chunk_ids: List[str] = field(default_factory=list)
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Cheap token estimate; close enough for budgeting English prose"""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+def _text_overlap(a: str, b: str, min_overlap: int) -> int:
+    """Length of the longest suffix of a that is a prefix of b (0 if < min_overlap)"""
+    if len(b) < min_overlap:
+        return 0
+    probe = b[:min_overlap]
+    idx = a.find(probe, max(0, len(a) - len(b)))
+    while idx != -1:
+        tail = a[idx:]
+        if b.startswith(tail):
+            return len(tail)
+        idx = a.find(probe, idx + 1)
+    return 0
+
+def _try_merge(a: Span, b: Span, min_overlap: int) -> Optional[Span]:
+    """Stitch b onto a if they cover overlapping text of the same source/page"""
+    if a.start is not None and b.start is not None:
+        first, second = (a, b) if a.start <= b.start else (b, a)
+        if second.start > first.end:
+            return None
+        tail = second.text[first.end - second.start:] if second.end > first.end else ""
+        merged_text = first.text + tail
+        merged_start = first.start
+    else:
+        if b.text in a.text:
+            merged_text = a.text
+        elif a.text in b.text:
+            merged_text = b.text
+        else:
+            n = _text_overlap(a.text, b.text, min_overlap)
+            if n:
+                merged_text = a.text + b.text[n:]
+            else:
+                n = _text_overlap(b.text, a.text, min_overlap)
+                if not n:
+                    return None
+                merged_text = b.text + a.text[n:]
+        merged_start = None
+    return Span(
+        source=a.source,
+        page=a.page,
+        text=merged_text,
+        score=max(a.score, b.score),
+        start=merged_start,
+        chunk_ids=a.chunk_ids + b.chunk_ids,
+    )
+
+def merge_overlapping(docs: List[Document], scores: List[float], min_overlap: int = 40) -> List[Span]:
+    """Group chunks by (source, page) and stitch overlapping neighbours into single spans"""
+    groups: Dict[Tuple[str, Optional[int]], List[Span]] = {}
+    for doc, score in zip(docs, scores):
+        meta = doc.metadata
+        span = Span(
+            source=str(meta.get("source", "unknown")).split('/')[-1],
+            page=meta.get("page"),
+            text=doc.page_content,
+            score=score,
+            start=meta.get("start_index"),
+            chunk_ids=[doc.id] if doc.id else [],
+        )
+        group = groups.setdefault((span.source, span.page), [])
+        # Keep merging until the new span no longer overlaps anything in its group
+        merged = True
+        while merged:
+            merged = False
+            for i, other in enumerate(group):
+                combined = _try_merge(other, span, min_overlap)
+                if combined is not None:
+                    span = combined
+                    del group[i]
+                    merged = True
+                    break
+        group.append(span)
+    return [span for group in groups.values() for span in group]
+
+def format_span(span: Span) -> str:
+    text = span.text.replace("\n", " ")
+    return f"[Source: {span.source}]\n{text}\n"
+
+def pack_spans(spans: List[Span], token_budget: int, chars_per_token: float = 4.0) -> Tuple[List[Span], int]:
+    """Take the highest-scoring spans that fit in token_budget; returns (spans, tokens_used)"""
+    packed, used = [], 0
+    for span in sorted(spans, key=lambda s: s.score, reverse=True):
+        cost = estimate_tokens(format_span(span), chars_per_token)
+        if used + cost > token_budget:
+            continue
+        packed.append(span)
+        used += cost
+    return packed, used
+
+def build_context(docs: List[Document], cfg: dict) -> Tuple[str, int, int]:
+    """
+    Merge, pack and format retrieved chunks (given in rank order).
+    Returns (context_block, tokens_used, span_count).
+    """
+    ctx_cfg = cfg["retrieval"].get("context", {})
+    chars_per_token = ctx_cfg.get("chars_per_token", 4.0)
+    # Rank order → descending scores so earlier chunks win ties for the budget
+    scores = [float(len(docs) - rank) for rank in range(len(docs))]
+    spans = merge_overlapping(docs, scores, ctx_cfg.get("min_overlap_chars", 40))
+
+    packed, used = pack_spans(spans, ctx_cfg.get("token_budget", 1500), chars_per_token)
+    return "\n".join(format_span(span) for span in packed), used, len(packed)
@@ -0,0 +1,65 @@
+import time
+from typing import Any, Dict, Iterator, Tuple
+from langchain_core.messages import AIMessage, ToolMessage
+from common import telemetry
+from common.logger_util import get_logger
+
+logger = get_logger()
+
+# Node → progress label shown while the node runs
+NODE_LABELS = {
+    "cache_lookup": "Checking answer cache",
+    "retrieve": "Retrieving policy documents",
+    "prefetch_metadata": "Looking up policy metadata",
+    "agent": "Consulting policy metadata",
+    "generate": "Generating answer",
+}
+
+# Only tokens from the final answer are streamed to the user
+ANSWER_NODE = "generate"
+
+def stream_turn(app, state: Dict[str, Any], config: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """
+    Run one graph turn and yield UI events as they happen:
+      ("progress", label)  a node started or a tool is being called
+      ("token", text)      a chunk of the answer from generate_node
+      ("done", result)     {"state": final state, "answer": str, "ttft": s|None, "total": s}
+    Time-to-first-token and total latency are logged for every turn.
+    """
+    with telemetry.trace("turn", thread_id=config.get("configurable", {}).get("thread_id"), streaming=True):
+        started = time.perf_counter()
+        first_token_at = None
+        streamed = []
+
+        for mode, payload in app.stream(state, config=config, stream_mode=["debug", "messages"]):
+            if mode == "debug":
+                if payload.get("type") == "task":
+                    label = NODE_LABELS.get(payload.get("payload", {}).get("name"))
+                    if label:
+                        yield "progress", label
+                continue
+
+            chunk, meta = payload
+            node = meta.get("langgraph_node")
+            if isinstance(chunk, ToolMessage):
+                yield "progress", f"Tool result from {chunk.name or 'tool'}"
+            elif getattr(chunk, "tool_call_chunks", None):
+                for tc in chunk.tool_call_chunks:
+                    if tc.get("name"):
+                        yield "progress", f"Calling tool: {tc['name']}"
+            elif node == ANSWER_NODE and isinstance(chunk.content, str) and chunk.content:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                streamed.append(chunk.content)
+                yield "token", chunk.content
+
+        total = time.perf_counter() - started
+        final_state = app.get_state(config).values
+        ai_msgs = [m for m in final_state.get("messages", []) if isinstance(m, AIMessage)]
+        answer = ai_msgs[-1].content if ai_msgs else "".join(streamed) or "(no response)"
+        ttft = first_token_at - started if first_token_at is not None else None
+
+        ttft_txt = f"{ttft:.2f}s" if ttft is not None else "n/a"
+        logger.info(f"Turn latency: time-to-first-token={ttft_txt} total={total:.2f}s")
+        telemetry.record(ttft_ms=ttft * 1000 if ttft is not None else None, total_ms=total * 1000)
+        yield "done", {"state": final_state, "answer": answer, "ttft": ttft, "total": total}
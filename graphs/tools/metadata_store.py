@@ -0,0 +1,163 @@
+import csv
+import os
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+COLUMNS = ["policy_title", "published_status", "managers", "business_owner", "review_cycle"]
+
+# Searchable columns and how much a match on each counts; titles win ties
+SEARCH_FIELDS = {"policy_title": 1.0, "business_owner": 0.9, "managers": 0.9}
+
+def normalize(text: str) -> str:
+    text = re.sub(r"[_\-]+", " ", (text or "").lower())
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def ngrams(text: str, n: int = 3) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)} if text else set()
+
+class MetadataStore:
+    """
+    In-memory policy metadata loaded from the CSV and reloaded only when the
+    file's mtime/size change. Title, owner and manager columns are normalized
+    once and indexed two ways: word → rows (inverted) and character trigram →
+    rows, so a lookup touches only candidate rows and ranks them fuzzily.
+    """
+
+    def __init__(self, path: str, top_n: int = 5, min_score: float = 0.3):
+        self.path = Path(path)
+        self.top_n = top_n
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self.rows: List[Dict[str, str]] = []
+        # Per row, per search field: (normalized text, word set, trigram set)
+        self._norm: List[Dict[str, Tuple[str, Set[str], Set[str]]]] = []
+        self._words: Dict[str, Dict[str, Set[int]]] = {}
+        self._grams: Dict[str, Dict[str, Set[int]]] = {}
+        # Empty indexes until the CSV exists, so lookups on a missing file just find nothing
+        self._build([])
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _maybe_reload(self) -> None:
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            self._build(self._read() if stamp else [])
+            self._stamp = stamp
+
+    def _read(self) -> List[Dict[str, str]]:
+        print(f"[INFO] Loading metadata from {self.path}")
+        with open(self.path, newline="", encoding="utf-8-sig") as f:
+            return [{col: (row.get(col) or "").strip() for col in COLUMNS} for row in csv.DictReader(f)]
+
+    def _build(self, rows: List[Dict[str, str]]) -> None:
+        norm = []
+        words = {field: defaultdict(set) for field in SEARCH_FIELDS}
+        grams = {field: defaultdict(set) for field in SEARCH_FIELDS}
+        for i, row in enumerate(rows):
+            n_row = {}
+            for field in SEARCH_FIELDS:
+                text = normalize(row[field])
+                field_words, field_grams = set(text.split()), ngrams(text)
+                n_row[field] = (text, field_words, field_grams)
+                for word in field_words:
+                    words[field][word].add(i)
+                for gram in field_grams:
+                    grams[field][gram].add(i)
+            norm.append(n_row)
+        # Swap in the finished indexes together so readers never see a partial build
+        self.rows, self._norm, self._words, self._grams = rows, norm, dict(words), dict(grams)
+
+    def titles(self) -> List[str]:
+        self._maybe_reload()
+        return [row["policy_title"] for row in self.rows if row["policy_title"]]
+
+    def _candidates(self, q_words: Set[str], q_grams: Set[str], fields) -> Set[int]:
+        """Rows sharing a selective word or trigram with the query (common ones like 'policy' are skipped)"""
+        cap = max(64, len(self.rows) // 20)
+        found: Set[int] = set()
+        for field in fields:
+            postings = [self._words[field].get(w) for w in q_words] + [self._grams[field].get(g) for g in q_grams]
+            postings = sorted((p for p in postings if p), key=len)
+            selective = [p for p in postings if len(p) <= cap] or postings[:3]
+            for p in selective:
+                found |= p
+        return found
+
+    @staticmethod
+    def _score(q: str, q_words: Set[str], q_grams: Set[str], field: Tuple[str, Set[str], Set[str]]) -> float:
+        """Exact > substring > word overlap / trigram similarity, all in [0, 1]"""
+        text, words, grams = field
+        if not text:
+            return 0.0
+        shared = len(q_grams & grams)
+        jaccard = shared / (len(q_grams) + len(grams) - shared)
+        if text == q:
+            return 1.0
+        if f" {q} " in f" {text} " or f" {text} " in f" {q} ":
+            return 0.8 + 0.2 * jaccard
+        return max(0.8 * len(q_words & words) / len(q_words), jaccard)
+
+    def _rank(self, query: str, fields: Dict[str, float]) -> List[Tuple[int, float]]:
+        self._maybe_reload()
+        q = normalize(query)
+        if not q:
+            return []
+        q_words, q_grams = set(q.split()), ngrams(q)
+        scored = []
+        for i in self._candidates(q_words, q_grams, fields):
+            row = self._norm[i]
+            score = max(self._score(q, q_words, q_grams, row[f]) * w for f, w in fields.items())
+            scored.append((i, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def search(self, query: str, top_n: Optional[int] = None) -> List[Tuple[Dict[str, str], float]]:
+        """Best-matching rows for a title, owner or manager query, highest score first"""
+        ranked = [(i, s) for i, s in self._rank(query, SEARCH_FIELDS) if s >= self.min_score]
+        return [(self.rows[i], score) for i, score in ranked[:top_n or self.top_n]]
+
+    def closest_titles(self, query: str, top_n: Optional[int] = None) -> List[str]:
+        """Titles most similar to the query, regardless of min_score (suggestions for a miss)"""
+        ranked = self._rank(query, {"policy_title": 1.0})
+        return [self.rows[i]["policy_title"] for i, _ in ranked[:top_n or self.top_n]]
+
+def format_row(row: Dict[str, str]) -> str:
+    mgr = row["managers"] or "—"
+    return (
+        f"- {row['policy_title']} | status: {row['published_status']} | "
+        f"manager(s): {mgr} | owner: {row['business_owner']} | review: {row['review_cycle']}"
+    )
+
+_STORES: Dict[str, MetadataStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def get_metadata_store(cfg: dict) -> MetadataStore:
+    """Return the process-wide metadata store for the configured CSV"""
+    path = cfg["storage"]["metadata_csv"]
+    store = _STORES.get(path)
+    if store is None:
+        with _STORES_LOCK:
+            store = _STORES.get(path)
+            if store is None:
+                lookup_cfg = cfg.get("metadata_lookup", {})
+                store = _STORES[path] = MetadataStore(
+                    path,
+                    top_n=lookup_cfg.get("top_n", 5),
+                    min_score=lookup_cfg.get("min_score", 0.3),
+                )
+    return store
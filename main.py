@@ -1,17 +1,59 @@
+import argparse
 import os
 from rich.console import Console
-from langchain_core.messages import HumanMessage, AIMessage
-from graphs.policy_graph import build_graph
+from common.config import load_config
 from common.logger_util import init_logger
 
+# The graph, LangChain and model clients are imported on first use so that
+# `--help` and startup don't pay for them.
 console = Console()
-APP = build_graph()
+
+def run_turn(init_state: dict, thread_id: str) -> tuple[str, dict]:
+    """Run one turn, streaming progress and answer tokens to the console"""
+    from langchain_core.messages import AIMessage
+    from common import telemetry
+    from graphs.policy_graph import get_graph
+    from graphs.streaming import stream_turn
+
+    app = get_graph()
+    if not load_config()["llm"].get("streaming", False):
+        with telemetry.trace("turn", thread_id=thread_id, streaming=False):
+            final_state = app.invoke(
+                init_state,
+                config={"configurable": {"thread_id": thread_id}},
+            )
+        msgs = final_state["messages"]
+        ai_msgs = [m for m in msgs if isinstance(m, AIMessage)]
+        resp = ai_msgs[-1].content if ai_msgs else "(no response)"
+        console.print(f"[bold magenta]Assistant:[/bold magenta] {resp}\n")
+        return resp, final_state
+
+    streamed = ""
+    for kind, payload in stream_turn(app, init_state, {"configurable": {"thread_id": thread_id}}):
+        if kind == "progress":
+            console.print(f"[dim]… {payload}[/dim]")
+        elif kind == "token":
+            if not streamed:
+                console.print("[bold magenta]Assistant:[/bold magenta] ", end="")
+            streamed += payload
+            console.print(payload, end="", markup=False, highlight=False)
+        else:
+            resp, final_state = payload["answer"], payload["state"]
+    # Cached answers arrive without tokens; notes appended after generation arrive at the end
+    if not streamed:
+        console.print("[bold magenta]Assistant:[/bold magenta] ", end="")
+        console.print(resp, end="", markup=False, highlight=False)
+    elif resp.startswith(streamed):
+        console.print(resp[len(streamed):], end="", markup=False, highlight=False)
+    console.print("\n")
+    return resp, final_state
 
 def chat_loop(thread_id: str, logger=None):
+    from langchain_core.messages import HumanMessage
+    from graphs.policy_graph import get_graph
+
     console.print("[bold green]Policy Assistant (dev) — type 'exit' or 'quit' to quit[/bold green]")
-    
-    # Initialize conversation history
-    conversation_history = []
+    get_graph()  # build before the first prompt rather than during the first turn
     
     while True:
         try:
@@ -22,41 +64,39 @@ def chat_loop(thread_id: str, logger=None):
             if user.lower() in {"exit", "quit"}:
                 break
 
-            # Add user message to history
-            current_message = HumanMessage(content=user)
-            conversation_history.append(current_message)
-
+            # Only the new message: earlier turns are restored from the thread's checkpoint
             init_state = {
-                "messages": conversation_history.copy(),
+                "messages": [HumanMessage(content=user)],
                 "context": "",
                 "metadata_text": "",
                 "tool_called": False,
+                "filters": None,
             }
             
             logger.info(f"Initial State: {init_state}")
             
-            final_state = APP.invoke(
-                init_state,
-                config={"configurable": {"thread_id": thread_id}},
-            )
-            
-            msgs = final_state["messages"]
-            ai_msgs = [m for m in msgs if isinstance(m, AIMessage)]
-            resp = ai_msgs[-1].content if ai_msgs else "(no response)"
+            resp, final_state = run_turn(init_state, thread_id)
             logger.info(f"Response: {resp}")
-            # Add assistant's response to history
-            conversation_history.append(AIMessage(content=resp))
-            
-            logger.info(f"Final State: {final_state}")
-            
-            console.print(f"[bold magenta]Assistant:[/bold magenta] {resp}\n")
+
+            logger.debug(f"Final State: {final_state}")
             
         except KeyboardInterrupt:
             break
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Policy Assistant (dev CLI)")
+    parser.add_argument(
+        "--session-id",
+        default=os.getenv("SESSION_ID"),
+        help="Log session / conversation thread id (default: $SESSION_ID or a new session)",
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
 
-    session_id = os.getenv("SESSION_ID", None)
+    args = parse_args()
+    session_id = args.session_id
     logger, session_path = init_logger(name="policy", session_id=session_id)
     
-    chat_loop(session_id, logger)
+    # One checkpoint thread per CLI session
+    chat_loop(session_id or session_path.name, logger)
@@ -0,0 +1,45 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+CORPUS_VERSION_FILE = Path("data/corpus_version.json")
+
+_lock = threading.Lock()
+_cached: dict = {}
+
+def get_corpus_version(path: Path = CORPUS_VERSION_FILE) -> int:
+    """
+    Return the current corpus version (0 if never bumped).
+    The file is only re-read when its mtime changes, so this is cheap per query.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return 0
+    key = str(path)
+    cached = _cached.get(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        with path.open("r") as f:
+            version = int(json.load(f).get("version", 0))
+    except (OSError, ValueError):
+        return 0
+    _cached[key] = (stamp, version)
+    return version
+
+def bump_corpus_version(path: Path = CORPUS_VERSION_FILE) -> int:
+    """Increment the corpus version after any change to the indexed documents"""
+    with _lock:
+        _cached.pop(str(path), None)
+        version = get_corpus_version(path) + 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w") as f:
+            json.dump({"version": version, "updated_at": datetime.now().isoformat()}, f)
+        os.replace(tmp, path)
+        _cached.pop(str(path), None)
+        return version
@@ -1,17 +1,52 @@
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from dataclasses import asdict
 from datetime import datetime
 from pipeline.hygiene import file_sha256
+from pipeline.corpus_version import bump_corpus_version
 from pipeline.schema import DocMeta
-from common.logger_util import init_logger
+from common.logger_util import get_logger
 
 class DocumentTracker:
-    def __init__(self, track_file: str = "data/document_registry.json"):
+    """
+    Registry of ingested documents keyed by file hash.
+
+    Entries are never overwritten: a file whose content matches an earlier,
+    superseded version (a revert) is registered under a suffixed key
+    (`<hash>:<n>`) and the entry stores its `file_hash`, so the lineage of a
+    title stays a chain.
+
+    File hashes are cached by (path, size, mtime_ns, inode) in a sidecar file
+    next to the registry, so a scan only re-reads files whose stat changed;
+    files above `parallel_hash_mb` are hashed on a thread pool (hashlib
+    releases the GIL). Titles and hashes map to their current version's key in memory,
+    so version lookups do not walk the registry.
+    """
+
+    def __init__(
+        self,
+        track_file: str = "data/document_registry.json",
+        hash_workers: int = 4,
+        parallel_hash_mb: float = 8,
+    ):
         self.track_file = Path(track_file)
+        self.hash_cache_file = self.track_file.with_name(f"{self.track_file.stem}.hashes.json")
+        self.hash_workers = max(1, hash_workers)
+        self.parallel_hash_bytes = int(parallel_hash_mb * 1024 * 1024)
         self.registry: Dict[str, dict] = self._load_registry()
-        self.logger = init_logger()[0]
+        self._current_by_title: Dict[str, str] = {}
+        self._current_by_hash: Dict[str, str] = {}
+        for key, entry in self.registry.items():
+            if not entry.get("superseded_by"):
+                self._current_by_title[entry.get("title")] = key
+                self._current_by_hash[entry.get("file_hash", key)] = key
+        # path -> [size, mtime_ns, inode, sha256]
+        self._hashes: Dict[str, list] = self._load_hash_cache()
+        self._hashes_dirty = False
+        self.logger = get_logger()
 
     def _load_registry(self) -> Dict[str, dict]:
         """Load existing document registry or create new one"""
@@ -26,6 +61,7 @@ class DocumentTracker:
                 except json.JSONDecodeError:
                     # self.logger.warning("Invalid JSON in document registry")
                     return {}
+        return {}
 
     def _save_registry(self) -> None:
         """Save registry to disk"""
@@ -33,58 +69,162 @@ class DocumentTracker:
         with self.track_file.open('w') as f:
             json.dump(self.registry, f, indent=2)
 
-    def get_document_state(self, file_path: Path) -> tuple[bool, str]:
+    def _load_hash_cache(self) -> Dict[str, list]:
+        if not self.hash_cache_file.exists():
+            return {}
+        try:
+            with self.hash_cache_file.open('r') as f:
+                hashes = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return hashes if isinstance(hashes, dict) else {}
+
+    def _save_hash_cache(self) -> None:
+        """Write the stat -> hash cache if it changed since the last save"""
+        if not self._hashes_dirty:
+            return
+        self.hash_cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.hash_cache_file.with_suffix(self.hash_cache_file.suffix + ".tmp")
+        with tmp.open('w') as f:
+            json.dump(self._hashes, f)
+        os.replace(tmp, self.hash_cache_file)
+        self._hashes_dirty = False
+
+    def hash_files(self, paths: Iterable[Path]) -> Dict[Path, str]:
+        """
+        sha256 of each file, re-reading only files whose size, mtime or inode
+        changed since they were last hashed
+        """
+        hashes: Dict[Path, str] = {}
+        stale: List[Tuple[Path, list]] = []
+        for path in paths:
+            st = path.stat()
+            stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+            cached = self._hashes.get(str(path))
+            if cached and cached[:3] == stamp:
+                hashes[path] = cached[3]
+            else:
+                stale.append((path, stamp))
+        if not stale:
+            return hashes
+
+        large = [item for item in stale if item[1][0] >= self.parallel_hash_bytes]
+        small = [item for item in stale if item[1][0] < self.parallel_hash_bytes]
+        digests = [(item, file_sha256(item[0])) for item in small]
+        if len(large) > 1 and self.hash_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.hash_workers, len(large))) as pool:
+                digests.extend(zip(large, pool.map(lambda item: file_sha256(item[0]), large)))
+        else:
+            digests.extend((item, file_sha256(item[0])) for item in large)
+
+        for (path, stamp), digest in digests:
+            self._hashes[str(path)] = stamp + [digest]
+            hashes[path] = digest
+        self._hashes_dirty = True
+        return hashes
+
+    def file_hash(self, file_path: Path) -> str:
+        return self.hash_files([file_path])[file_path]
+
+    def get_document_state(self, file_path: Path, file_hash: Optional[str] = None) -> tuple[bool, str]:
         """
         Check if a document has been processed before
         Returns: (is_processed, status_message)
         """
-        file_hash = file_sha256(file_path)
+        file_hash = file_hash or self.file_hash(file_path)
         
-        # Check if exact file was processed
-        if file_hash in self.registry:
+        # Check if exact file was processed (and is still the current version)
+        if file_hash in self._current_by_hash:
             return True, "File already processed"
             
-        # Check if different version of same policy exists
-        file_name = file_path.stem 
-        for entry in self.registry.values():
-            if entry['title'] == file_name:
-                return True, "Different version exists"
+        # A different version of the same policy is replaced in place
+        if self.previous_version(file_path, file_hash):
+            return False, "Different version exists"
                 
         return False, "New document"
 
+    def previous_version(self, file_path: Path, file_hash: Optional[str] = None) -> Optional[Tuple[str, dict]]:
+        """(key, entry) of the current registered version this file would supersede, if any"""
+        current = self._current_by_title.get(file_path.stem)
+        if current is None:
+            return None
+        entry = self.registry[current]
+        if entry.get("file_hash", current) == (file_hash or self.file_hash(file_path)):
+            return None
+        return current, entry
+
+    def _new_key(self, file_hash: str) -> str:
+        """Registry key for a new entry; a hash seen before gets a numbered suffix"""
+        key, n = file_hash, 1
+        while key in self.registry:
+            n += 1
+            key = f"{file_hash}:{n}"
+        return key
+
     def register_document(self, file_path: Path, metadata: DocMeta) -> None:
         """
         Register a new document in the tracking system
         """
-        file_hash = file_sha256(file_path)
-        
-        # Convert metadata to dict and add processing info
-        doc_info = asdict(metadata)
-        doc_info.update({
-            "processed_at": datetime.now().isoformat(),
-            "file_path": str(file_path),
-            "file_size": file_path.stat().st_size
-        })
-        
-        self.registry[file_hash] = doc_info
+        self.register_documents([(file_path, metadata)])
+
+    def register_documents(
+        self,
+        documents: Sequence[Tuple[Path, DocMeta]],
+        chunk_ids: Optional[Dict[Path, List[str]]] = None,
+    ) -> None:
+        """
+        Register a batch of documents with one registry write and one corpus version bump.
+        A new version of a registered policy links to the entry it supersedes.
+        """
+        if not documents:
+            return
+        hashes = self.hash_files([file_path for file_path, _ in documents])
+        for file_path, metadata in documents:
+            file_hash = hashes[file_path]
+            previous = self.previous_version(file_path, file_hash)
+            processed_at = datetime.now().isoformat()
+
+            # Convert metadata to dict and add processing info
+            doc_info = asdict(metadata)
+            doc_info.update({
+                "processed_at": processed_at,
+                "file_path": str(file_path),
+                "file_size": self._hashes[str(file_path)][0],
+                "file_hash": file_hash,
+                "version": 1,
+            })
+            key = self._new_key(file_hash)
+            if previous:
+                prev_key, prev_entry = previous
+                prev_entry["superseded_by"] = key
+                prev_entry["superseded_at"] = processed_at
+                doc_info["version"] = prev_entry.get("version", 1) + 1
+                doc_info["supersedes"] = prev_key
+                self._current_by_hash.pop(prev_entry.get("file_hash", prev_key), None)
+            if chunk_ids and file_path in chunk_ids:
+                doc_info["chunk_ids"] = chunk_ids[file_path]
+            self.registry[key] = doc_info
+            self._current_by_title[doc_info.get("title")] = key
+            self._current_by_hash[file_hash] = key
+
         self._save_registry()
+        self._save_hash_cache()
+        bump_corpus_version()
 
     def get_unprocessed_files(self, directory: Path) -> List[Path]:
         """
         Return list of PDF files that haven't been processed yet
         """
-        unprocessed = []
-        for pdf_path in directory.glob("*.pdf"):
-            is_processed, _ = self.get_document_state(pdf_path)
-            if not is_processed:
-                unprocessed.append(pdf_path)
-        return unprocessed
+        pdfs = sorted(directory.glob("*.pdf"))
+        hashes = self.hash_files(pdfs)
+        self._save_hash_cache()
+        return [p for p in pdfs if not self.get_document_state(p, hashes[p])[0]]
 
     def get_processed_files(self) -> List[str]:
-        """Return list of all processed files"""
-        return [entry['file_path'] for entry in self.registry.values()]
+        """Return list of all processed files (current versions)"""
+        return [entry['file_path'] for entry in self.registry.values() if not entry.get("superseded_by")]
 
     def get_document_metadata(self, file_path: Path) -> Dict:
         """Get metadata for a specific document if it exists"""
-        file_hash = file_sha256(file_path)
-        return self.registry.get(file_hash, {})
\ No newline at end of file
+        file_hash = self.file_hash(file_path)
+        return self.registry.get(self._current_by_hash.get(file_hash, file_hash), {})
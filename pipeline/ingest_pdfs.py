@@ -1,49 +1,59 @@
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Tuple
 from datetime import datetime
-from dataclasses import asdict
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from common import telemetry
 from common.config import load_config
+from common.embedding_cache import get_chunk_embedding_cache
+from common.resources import get_resources
 from pipeline.document_tracker import DocumentTracker
-from pipeline.schema import DocMeta
+from pipeline.schema import DocMeta, chunk_metadata
 from common.logger_util import init_logger
+from pipeline.corpus_version import bump_corpus_version
+from pipeline.storage.vector_store import VectorStore, open_vector_db
+from pipeline.ingestion.chunk_ids import assign_chunk_ids
+from pipeline.ingestion.pdf_parser import iter_parse_pdfs, parsing_config
+from pipeline.ingestion.embedder import embed_and_store, embedding_config, format_stats
+from pipeline.ingestion.streaming import ingest_stream, streaming_config
+from pipeline.ingestion.versioning import VersionPlanner
+from pipeline.storage.indexes import index_chunks
 import sys
 from typing import List
 
-def load_pdfs(pdf_dir: Path, tracker: DocumentTracker, session_path: Path, logger) -> List:
+def iter_pdfs(pdf_dir: Path, tracker: DocumentTracker, logger, parsing: dict = None) -> Iterator[Tuple[Tuple[Path, DocMeta], List]]:
+    """Yield ((path, meta), pages) for each new PDF as it is parsed, in file order"""
+    unprocessed_files = sorted(tracker.get_unprocessed_files(pdf_dir))
+    for p in unprocessed_files:
+        logger.info(f"Processing new file: {p.name}")
 
-    docs = []
-    unprocessed_files = tracker.get_unprocessed_files(pdf_dir)
-    
-    for p in sorted(unprocessed_files):
-        try:
-            logger.info(f"Processing new file: {p.name}")
-            loader = PyPDFLoader(str(p))
-            file_docs = loader.load()
-            
-            # Create metadata
-            meta = DocMeta(
-                source=p.name,
-                title=p.stem,
-                effective_date=datetime.now().strftime("%Y-%m-%d")
-            )
-            
-            # Register document
-            tracker.register_document(p, meta)
-            
-            # Add metadata to documents
-            for d in file_docs:
-                d.metadata.update(asdict(meta))
-            docs.extend(file_docs)
-            
-        except Exception as e:
-            logger.error(f"Failed to process {p.name}: {e}")
+    # Parse on a process pool; results come back in unprocessed_files order
+    for parsed in iter_parse_pdfs(unprocessed_files, **(parsing or {})):
+        p, file_docs = parsed.path, parsed.pages
+        if parsed.error:
+            logger.error(f"Failed to process {p.name}: {parsed.error}")
+            telemetry.count("ingest_failed_files")
             continue
+            
+        # Create metadata
+        meta = DocMeta(
+            source=p.name,
+            title=p.stem,
+            effective_date=datetime.now().strftime("%Y-%m-%d")
+        )
         
-    return docs
+        # Add metadata to documents
+        for d in file_docs:
+            d.metadata.update(chunk_metadata(meta))
+        yield (p, meta), file_docs
+
+def load_pdfs(pdf_dir: Path, tracker: DocumentTracker, session_path: Path, logger, parsing: dict = None) -> Tuple[List, List]:
+    """All pages of the new PDFs plus their (path, meta) entries, registered by the caller once stored"""
+    docs = []
+    loaded = []
+    for entry, file_docs in iter_pdfs(pdf_dir, tracker, logger, parsing):
+        loaded.append(entry)
+        docs.extend(file_docs)
+    telemetry.record(files=len(loaded))
+    return docs, loaded
 
 def reset_vectordb(persist_dir: str, collection_name: str, embed_model: str, force: bool = False, logger = None) -> bool:
     """Reset vector database and associated document tracker """
@@ -67,26 +77,21 @@ def reset_vectordb(persist_dir: str, collection_name: str, embed_model: str, for
             return False
     
     try:
-        # Initialize empty embeddings for connection
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        db = Chroma(
+        cfg = load_config()
+        store = VectorStore(
             persist_directory=persist_dir,
             collection_name=collection_name,
-            embedding_function=embeddings
+            embedding_model=embed_model,
+            backend=cfg["vector_store"].get("backend", "chroma"),
+            numpy_dtype=cfg["vector_store"].get("numpy", {}).get("dtype", "float16"),
         )
         
         # Get current document count for logging
-        initial_count = db._collection.count()
+        initial_count = store.count()
         
-        # Delete collection
-        db._client.delete_collection(collection_name)
-        
-        # Recreate empty collection
-        db = Chroma(
-            persist_directory=persist_dir,
-            collection_name=collection_name,
-            embedding_function=embeddings
-        )
+        # Delete and recreate the collection (also clears the lexical index
+        # and invalidates cached retrievers)
+        store.reset()
         
         success_msg = f"Successfully reset vector database. Removed {initial_count} documents."
         if logger:
@@ -103,13 +108,16 @@ def reset_vectordb(persist_dir: str, collection_name: str, embed_model: str, for
         return False
 
 def main():
+    # Heavy ML/parsing libraries load here rather than at import, so --help and imports stay fast
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
     logger, session_path = init_logger()
     
     cfg = load_config()
-    pdf_dir = Path(cfg["ingestion"]["pdf_dir"])
+    pdf_dir = Path(cfg["processing"]["pdf_dir"])
     persist_dir = cfg["vector_store"]["persist_directory"]
     collection_name = cfg["vector_store"]["collection_name"]
-    embed_model = HuggingFaceEmbeddings(model_name=cfg["embedding"]["model_name"])
+    embed_model = cfg["vector_store"]["embedding_model"]
     
     # Check for --reset flag
     if len(sys.argv) > 1 and sys.argv[1] == "--reset":
@@ -118,44 +126,99 @@ def main():
             # return
         
     # Initialize document tracker
-    tracker = DocumentTracker()
-    
-    logger.info(f"[INGEST] Loading PDFs from: {pdf_dir.resolve()}")
-    docs = load_pdfs(pdf_dir, tracker, session_path, logger)
-    
-    if not docs:
-        logger.info("[INGEST] No new PDFs to process.")
-        return
-    
-    logger.info(f"[INGEST] Processing {len(docs)} new documents")
-    logger.info(f"[INGEST] Processed files: {tracker.get_processed_files()}")
-    
+    tracker = DocumentTracker(cfg["storage"]["document_registry"])
+
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=cfg["ingestion"]["chunk_size"],
-        chunk_overlap=cfg["ingestion"]["chunk_overlap"],
-        separators=cfg["ingestion"]["separators"],
+        chunk_size=cfg["processing"]["chunk_size"],
+        chunk_overlap=cfg["processing"]["chunk_overlap"],
+        add_start_index=True,
     )
-    chunks = splitter.split_documents(docs)
-    print(f"[INGEST] Split into {len(chunks)} chunks.")
-
-    embeddings = HuggingFaceEmbeddings(model_name=cfg["embedding"]["model_name"])
-    vectordb = Chroma(
-        persist_directory=persist_dir,
-        collection_name=collection_name,
-        embedding_function=embeddings,
+    embeddings = get_resources().get_embeddings(embed_model)
+    vectordb = open_vector_db(
+        persist_dir,
+        collection_name,
+        embeddings,
+        backend=cfg["vector_store"].get("backend", "chroma"),
+        numpy_dtype=cfg["vector_store"].get("numpy", {}).get("dtype", "float16"),
     )
     
-    # Add new chunks to existing collection
-    vectordb.add_documents(chunks)
-    logger.info(f"[INGEST] Added new chunks to Chroma at: {Path(persist_dir).resolve()}")
+    # New versions of registered policies only store their changed chunks
+    planner = VersionPlanner(tracker, vectordb, cfg)
+
+    logger.info(f"[INGEST] Loading PDFs from: {pdf_dir.resolve()}")
+    if streaming_config(cfg)["enabled"]:
+        # Pages, chunks and embeddings flow through bounded queues; nothing holds the whole corpus
+        with telemetry.span("ingest.stream"):
+            registered, stats = ingest_stream(
+                iter_pdfs(pdf_dir, tracker, logger, parsing=parsing_config(cfg)),
+                splitter,
+                vectordb,
+                embeddings,
+                cfg,
+                model_name=embed_model,
+                select=planner.select,
+            )
+            telemetry.record(**stats)
+        if not registered:
+            logger.info("[INGEST] No new PDFs to process.")
+            return
+        new_files, new_chunks = stats["files"], stats["chunks"]
+    else:
+        with telemetry.span("ingest.load"):
+            docs, registered = load_pdfs(pdf_dir, tracker, session_path, logger, parsing=parsing_config(cfg))
+            telemetry.record(pages=len(docs))
+        
+        if not docs:
+            logger.info("[INGEST] No new PDFs to process.")
+            return
+        
+        logger.info(f"[INGEST] Processing {len(docs)} new documents")
+        
+        with telemetry.span("ingest.split", pages=len(docs)):
+            chunks = planner.select_all(registered, assign_chunk_ids(splitter.split_documents(docs)))
+            telemetry.record(chunks=len(chunks))
+        print(f"[INGEST] Split into {len(chunks)} chunks.")
+        
+        # Embed and add new chunks to the existing collection batch by batch
+        with telemetry.span("ingest.store", chunks=len(chunks)):
+            stats = embed_and_store(
+                vectordb,
+                chunks,
+                embeddings,
+                model_name=embed_model,
+                cache=get_chunk_embedding_cache(cfg, embed_model),
+                **embedding_config(cfg),
+            )
+            telemetry.record(**stats)
+        with telemetry.span("ingest.index", chunks=len(chunks)):
+            index_chunks(cfg, chunks)
+        new_files, new_chunks = len(registered), len(chunks)
+
+    # The new versions are stored, so their predecessors' leftover chunks can go
+    with telemetry.span("ingest.supersede"):
+        planner.remove_superseded()
+        telemetry.record(**planner.stats)
+    tracker.register_documents(registered, chunk_ids=planner.chunk_ids)
+    telemetry.count("ingested_chunks", new_chunks)
+    bump_corpus_version()
+    logger.info(f"[INGEST] Processed files: {tracker.get_processed_files()}")
+    logger.info(f"[INGEST] Added new chunks to vector store at: {Path(persist_dir).resolve()}")
     
     # draft - print ingestion summary
     print("\nIngestion Summary:")
     print(f"- Total files processed: {len(tracker.get_processed_files())}")
-    print(f"- New files in this run: {len(docs)}")
-    print(f"- New chunks added: {len(chunks)}")
+    print(f"- New files in this run: {new_files}")
+    print(f"- New chunks added: {new_chunks}")
+    if planner.stats["updated_files"]:
+        print(
+            f"- Updated policies: {planner.stats['updated_files']} "
+            f"({planner.stats['unchanged_chunks']} chunks unchanged, "
+            f"{planner.stats['removed_chunks']} superseded chunks removed)"
+        )
+    print(f"- Embedding: {format_stats(stats)}")
     print(f"- Processed files archived at: {session_path/'processed_docs'}")
 
 if __name__ == "__main__":
-    main()
+    with telemetry.trace("ingest_pdfs"):
+        main()
 
@@ -0,0 +1,35 @@
+import hashlib
+import re
+from typing import Dict, List
+
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize_chunk_text(text: str) -> str:
+    """Whitespace-insensitive form of a chunk's text (PDF extraction varies in spacing)"""
+    return _SPACE_RE.sub(" ", text or "").strip()
+
+def content_hash(text: str) -> str:
+    """Hash of the normalized text; identical text shares one embedding wherever it appears"""
+    return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).hexdigest()
+
+def chunk_id(text: str, source: str) -> str:
+    """Deterministic id for a chunk: the same text from the same source always maps to the same id"""
+    raw = f"{source}\x00{normalize_chunk_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+def assign_chunk_ids(chunks: List) -> List:
+    """
+    Give every chunk a content-derived id before it is written, so the vector
+    store and the lexical index refer to the same chunk by the same id and
+    re-ingesting unchanged text upserts instead of duplicating. Repeated text
+    within one source gets an occurrence suffix to keep ids unique.
+    """
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        if getattr(chunk, "id", None):
+            continue
+        cid = chunk_id(chunk.page_content, chunk.metadata.get("source", ""))
+        n = seen.get(cid, 0)
+        seen[cid] = n + 1
+        chunk.id = cid if n == 0 else f"{cid}-{n}"
+    return chunks
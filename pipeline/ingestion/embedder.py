@@ -0,0 +1,185 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .chunk_ids import content_hash
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ProgressFn = Callable[[int, Optional[int], float], None]
+
+def embedding_config(cfg: dict) -> Dict:
+    emb = cfg.get("processing", {}).get("embedding", {})
+    return {
+        "batch_size": emb.get("batch_size", 64),
+        "workers": emb.get("workers", 1),
+    }
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+def peak_rss_mb(workers: bool = False) -> Dict[str, Optional[float]]:
+    """Peak resident memory of this process and, if asked, of its (finished) worker processes"""
+    if resource is None:
+        return {"peak_rss_mb": None, "peak_worker_rss_mb": None}
+    # ru_maxrss is in KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024 if workers else None
+    return {"peak_rss_mb": round(own, 1), "peak_worker_rss_mb": round(children, 1) if children else None}
+
+# ----- worker process side -----
+
+_worker_embeddings = None
+
+def _init_worker(model_name: str, threads: int) -> None:
+    global _worker_embeddings
+    try:
+        import torch
+        # Split the cores between workers instead of every worker using all of them
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from langchain_huggingface import HuggingFaceEmbeddings
+    _worker_embeddings = HuggingFaceEmbeddings(model_name=model_name)
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    return _worker_embeddings.embed_documents(texts)
+
+# ----- parent side -----
+
+def write_batch(db, chunks: List, vectors: List[List[float]]) -> None:
+    """Write pre-computed embeddings to either backend without re-embedding"""
+    texts = [c.page_content for c in chunks]
+    metadatas = [c.metadata for c in chunks]
+    ids = [c.id for c in chunks]
+    if hasattr(db, "add_embeddings"):
+        db.add_embeddings(texts, vectors, metadatas, ids)
+    else:
+        # Chroma: the same call langchain_chroma makes after embedding
+        db._collection.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=texts)
+
+def write_metadata(db, chunks: List) -> None:
+    """Replace stored chunks' metadata in either backend, keeping their embeddings"""
+    if not chunks:
+        return
+    ids = [c.id for c in chunks]
+    metadatas = [c.metadata for c in chunks]
+    if hasattr(db, "update_metadata"):
+        db.update_metadata(ids, metadatas)
+    else:
+        db._collection.update(ids=ids, metadatas=metadatas)
+
+def _done(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+def _print_progress(done: int, total: Optional[int], elapsed: float) -> None:
+    rate = done / elapsed if elapsed > 0 else 0.0
+    of = f"/{total}" if total else ""
+    print(f"[EMBED] {done}{of} chunks embedded ({rate:.1f} chunks/s)")
+
+def embed_and_store(
+    db,
+    chunks: Iterable,
+    embeddings,
+    model_name: Optional[str] = None,
+    batch_size: int = 64,
+    workers: int = 1,
+    total: Optional[int] = None,
+    progress: Optional[ProgressFn] = _print_progress,
+    on_batch: Optional[Callable[[List], None]] = None,
+    cache=None,
+) -> Dict:
+    """
+    Embed chunks `batch_size` at a time and write each batch to the store as
+    soon as it is encoded, so memory holds a few batches rather than the whole
+    upload. With `workers` > 1 (and a HuggingFace `model_name`) batches are
+    encoded on a process pool, each worker loading the model once; at most
+    2 × workers batches are in flight and they are written in input order.
+
+    With a ChunkEmbeddingCache only text whose content hash is not cached (and
+    not repeated earlier in the batch) reaches the model. `on_batch` is called
+    with each batch once it is stored. Returns chunk count, chunks embedded,
+    cache hits, elapsed time, chunks/sec and peak RSS.
+    """
+    if total is None and hasattr(chunks, "__len__"):
+        total = len(chunks)
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    done = embedded = 0
+
+    def lookup(batch: List) -> Tuple[Optional[List[str]], Dict[str, List[float]], List[str], List[str]]:
+        """Content hashes, cached vectors, and the (deduplicated) texts still to encode"""
+        if cache is None:
+            return None, {}, [], [c.page_content for c in batch]
+        hashes = [content_hash(c.page_content) for c in batch]
+        found = cache.get_many(hashes)
+        todo: Dict[str, str] = {}
+        for c, h in zip(batch, hashes):
+            if h not in found and h not in todo:
+                todo[h] = c.page_content
+        return hashes, found, list(todo), list(todo.values())
+
+    def written(batch: List, looked_up, encoded: List[List[float]]) -> None:
+        nonlocal done, embedded
+        hashes, found, todo_hashes, _ = looked_up
+        if hashes is None:
+            vectors = encoded
+        else:
+            new = dict(zip(todo_hashes, encoded))
+            cache.put_many(new)
+            found.update(new)
+            vectors = [found[h] for h in hashes]
+        write_batch(db, batch, vectors)
+        if on_batch:
+            on_batch(batch)
+        done += len(batch)
+        embedded += len(encoded)
+        if progress:
+            progress(done, total, time.perf_counter() - start)
+
+    use_pool = workers > 1 and bool(model_name)
+    if not use_pool:
+        for batch in batched(chunks, batch_size):
+            looked_up = lookup(batch)
+            texts = looked_up[3]
+            written(batch, looked_up, embeddings.embed_documents(texts) if texts else [])
+    else:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_name, threads)) as pool:
+            pending = deque()
+            for batch in batched(chunks, batch_size):
+                looked_up = lookup(batch)
+                texts = looked_up[3]
+                pending.append((batch, looked_up, pool.submit(_encode, texts) if texts else _done([])))
+                if len(pending) >= 2 * workers:
+                    batch, looked_up, future = pending.popleft()
+                    written(batch, looked_up, future.result())
+            while pending:
+                batch, looked_up, future = pending.popleft()
+                written(batch, looked_up, future.result())
+
+    elapsed = time.perf_counter() - start
+    return {
+        "chunks": done,
+        "embedded": embedded,
+        "cache_hits": done - embedded,
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(done / elapsed, 1) if elapsed > 0 else None,
+        **peak_rss_mb(workers=use_pool),
+    }
+
+def format_stats(stats: Dict) -> str:
+    rss = f", peak RSS {stats['peak_rss_mb']} MB" if stats.get("peak_rss_mb") is not None else ""
+    if stats.get("peak_worker_rss_mb"):
+        rss += f" (workers {stats['peak_worker_rss_mb']} MB)"
+    cached = f", {stats['cache_hits']} from embedding cache" if stats.get("cache_hits") else ""
+    return f"{stats['chunks']} chunks in {stats['seconds']:.1f}s ({stats['chunks_per_sec'] or 0} chunks/s){cached}{rss}"
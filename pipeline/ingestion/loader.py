@@ -1,49 +1,62 @@
 from pathlib import Path
-from typing import List
-from langchain_community.document_loaders import PyPDFLoader
+from typing import Iterator, List, Tuple
+from datetime import datetime
 from ..storage.document_store import DocumentStore
 from ..utils.document_tracker import DocumentTracker
+from ..schema import DocMeta, chunk_metadata
+from .pdf_parser import iter_parse_pdfs, parsing_config
+from common.config import load_config
 
 class DocumentLoader:
-    def __init__(self, tracker: DocumentTracker, doc_store: DocumentStore):
+    def __init__(self, tracker: DocumentTracker, doc_store: DocumentStore, workers: int = None):
         self.tracker = tracker
         self.doc_store = doc_store
+        self.parsing = parsing_config(load_config())
+        if workers is not None:
+            self.parsing["workers"] = workers
 
-    def load_documents(self, pdf_dir: Path) -> List:
-        """Load unprocessed PDF documents"""
+    def iter_documents(self, pdf_dir: Path) -> Iterator[Tuple[Tuple[Path, Path], List]]:
+        """Yield ((original, archived path), pages) for each uploaded PDF as it is parsed"""
+        # Get all PDF files in directory
+        pdf_files = sorted(pdf_dir.glob("**/temp_uploads/*.pdf"))
+
+        # Parse every file on the process pool; results keep pdf_files order
+        for parsed in iter_parse_pdfs(pdf_files, **self.parsing):
+            file_path, documents = parsed.path, parsed.pages
+            if parsed.error:
+                print(f"Error loading {file_path}: {parsed.error}")
+                continue
+            try:
+                if documents:
+                    # Archive the document
+                    archived_path = self.doc_store.archive_document(file_path)
+
+                    # Add metadata to documents
+                    meta = DocMeta(
+                        source=str(file_path.name),
+                        title=file_path.stem,
+                        effective_date=datetime.now().strftime("%Y-%m-%d")
+                    )
+                    for doc in documents:
+                        doc.metadata.update(chunk_metadata(meta))
+                        doc.metadata["archived_path"] = str(archived_path)
+
+                    yield (file_path, archived_path), documents
+
+            except Exception as e:
+                print(f"Error loading {file_path}: {e}")
+                continue
+
+    def load_documents(self, pdf_dir: Path) -> Tuple[List, List[Tuple[Path, Path]]]:
+        """Pages of the unprocessed PDFs plus their (original, archived) paths, registered by the caller once stored"""
         docs = []
+        loaded = []
         try:
-            # Get all PDF files in directory
-            pdf_files = list(pdf_dir.glob("**/temp_uploads/*.pdf"))
-            
-            for file_path in pdf_files:
-                try:
-                    # Load document
-                    loader = PyPDFLoader(str(file_path))
-                    documents = loader.load()
-                    
-                    if documents:
-                        # Archive the document
-                        archived_path = self.doc_store.archive_document(file_path)
-                        
-                        # Update tracker with archived path
-                        self.tracker.register_document(file_path, archived_path)
-                        
-                        # Add metadata to documents
-                        for doc in documents:
-                            doc.metadata.update({
-                                "source": str(file_path.name),
-                                "archived_path": str(archived_path)
-                            })
-                        
-                        docs.extend(documents)
-                        
-                except Exception as e:
-                    print(f"Error loading {file_path}: {e}")
-                    continue
-                    
-            return docs
+            for entry, documents in self.iter_documents(pdf_dir):
+                loaded.append(entry)
+                docs.extend(documents)
+            return docs, loaded
             
         except Exception as e:
             print(f"Error scanning directory {pdf_dir}: {e}")
-            return []
\ No newline at end of file
+            return [], []
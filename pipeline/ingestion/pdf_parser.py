@@ -0,0 +1,124 @@
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# (file index, first page, end page or None for "to the last page")
+Task = Tuple[int, int, Optional[int]]
+
+@dataclass
+class ParsedFile:
+    """Pages extracted from one PDF; `error` is set (and `pages` empty) when any part failed"""
+    path: Path
+    pages: List = field(default_factory=list)
+    error: Optional[str] = None
+
+def parsing_config(cfg: dict) -> Dict:
+    parsing = cfg.get("processing", {}).get("parsing", {})
+    return {
+        "workers": parsing.get("workers", 0),
+        "pages_per_task": parsing.get("pages_per_task", 50),
+        "split_above_mb": parsing.get("split_above_mb", 5),
+    }
+
+def _parse_pages(path: str, start: int, stop: Optional[int]) -> List:
+    """Extract pages [start, stop) of one PDF as Documents (runs in a worker process)"""
+    from langchain_core.documents import Document
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    total = len(reader.pages)
+    stop = total if stop is None else min(stop, total)
+    return [
+        Document(
+            page_content=reader.pages[i].extract_text(),
+            metadata={"source": path, "page": i, "total_pages": total},
+        )
+        for i in range(start, stop)
+    ]
+
+def _page_count(path: Path) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(str(path)).pages)
+
+def _plan(paths: Sequence[Path], pages_per_task: int, split_above_mb: float) -> Tuple[List[Task], Dict[int, str]]:
+    """One task per file, except large files which are cut into page ranges"""
+    tasks: List[Task] = []
+    errors: Dict[int, str] = {}
+    for i, path in enumerate(paths):
+        try:
+            if pages_per_task > 0 and path.stat().st_size > split_above_mb * 1024 * 1024:
+                total = _page_count(path)
+                tasks.extend((i, start, start + pages_per_task) for start in range(0, total, pages_per_task))
+                continue
+        except Exception as e:
+            errors[i] = str(e)
+            continue
+        tasks.append((i, 0, None))
+    return tasks, errors
+
+def _run_tasks(paths: List[Path], tasks: List[Task], workers: int) -> Iterator[Tuple[Task, Optional[List], Optional[str]]]:
+    """Yield (task, pages, error) in task order, keeping at most 2 × workers tasks in flight"""
+    if workers == 1:
+        for task in tasks:
+            try:
+                yield task, _parse_pages(str(paths[task[0]]), task[1], task[2]), None
+            except Exception as e:
+                yield task, None, str(e)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, pool.submit(_parse_pages, str(paths[task[0]]), task[1], task[2])))
+            if len(pending) < 2 * workers:
+                continue
+            yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+
+def _collect(task: Task, future) -> Tuple[Task, Optional[List], Optional[str]]:
+    try:
+        return task, future.result(), None
+    except Exception as e:
+        return task, None, str(e)
+
+def iter_parse_pdfs(
+    paths: Sequence[Path],
+    workers: int = 0,
+    pages_per_task: int = 50,
+    split_above_mb: float = 5,
+) -> Iterator[ParsedFile]:
+    """
+    Extract the pages of many PDFs on a process pool (`workers` <= 0 means one
+    per CPU, 1 parses in-process), yielding each file as soon as it and all
+    earlier files are done. Files come back in the order of `paths` with pages
+    in page order; a file that fails, in whole or in one of its page ranges,
+    is reported with its error and does not affect the others.
+    """
+    paths = [Path(p) for p in paths]
+    tasks, errors = _plan(paths, pages_per_task, split_above_mb)
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, len(tasks)) or 1
+    task_counts = Counter(task[0] for task in tasks)
+
+    # Tasks were planned file by file, page range by page range, so results
+    # arrive grouped by file and in page order
+    results = _run_tasks(paths, tasks, workers)
+    for i, path in enumerate(paths):
+        parsed = ParsedFile(path, error=errors.get(i))
+        for _ in range(task_counts[i]):
+            _, pages, error = next(results)
+            if error and not parsed.error:
+                parsed.error = error
+            elif not parsed.error:
+                parsed.pages.extend(pages)
+        if parsed.error:
+            parsed.pages = []
+        yield parsed
+
+def parse_pdfs(paths: Sequence[Path], **options) -> List[ParsedFile]:
+    """All files parsed (see iter_parse_pdfs), in the order of `paths`"""
+    return list(iter_parse_pdfs(paths, **options))
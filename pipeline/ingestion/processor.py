@@ -1,8 +1,12 @@
 from pathlib import Path
-from typing import List, Optional
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 from ..storage.vector_store import VectorStore
+from .chunk_ids import assign_chunk_ids
+from common import telemetry
 from common.config import load_config
+from ..storage.indexes import index_chunks
+from .streaming import ingest_stream
+from pipeline.corpus_version import bump_corpus_version
 
 class DocumentProcessor:
     def __init__(
@@ -11,33 +15,90 @@ class DocumentProcessor:
         chunk_size: int = None,
         chunk_overlap: int = None
     ):
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         self.vector_store = vector_store
         config = load_config()
+        self.config = config
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size or config["processing"]["chunk_size"],
             chunk_overlap=chunk_overlap or config["processing"]["chunk_overlap"],
+            add_start_index=True,  # lets retrieval stitch overlapping neighbours
         )
 
-    def process_documents(self, documents: List) -> bool:
-        """Process documents and add to vector store"""
+    def process_documents(self, documents: List, select: Optional[Callable[[List], List]] = None) -> bool:
+        """
+        Process documents and add to vector store. `select(chunks)` may narrow
+        the chunks to those that need storing (see VersionPlanner.select_all).
+        """
         if not documents:
             print("No documents to process")
             return False
             
         try:
-            # Split documents into chunks
-            chunks = self.splitter.split_documents(documents)
-            
-            if not chunks:
-                print("No chunks created from documents")
-                return False
-            
-            # Add to vector store
-            self.vector_store.add_documents(chunks)
-            print(f"Successfully added {len(chunks)} chunks to vector store")
-            
-            return True
+            with telemetry.trace("ingest", documents=len(documents)):
+                # Split documents into chunks
+                with telemetry.span("ingest.split", documents=len(documents)):
+                    chunks = self.splitter.split_documents(documents)
+                    telemetry.record(chunks=len(chunks))
+
+                if not chunks:
+                    print("No chunks created from documents")
+                    return False
+
+                assign_chunk_ids(chunks)
+                if select:
+                    chunks = select(chunks)
+                    if not chunks:
+                        print("No changed chunks to store")
+                        return True
+
+                # Add to vector store
+                with telemetry.span("ingest.store", chunks=len(chunks)):
+                    self.vector_store.add_documents(chunks)
+                print(f"Successfully added {len(chunks)} chunks to vector store")
+                telemetry.count("ingested_chunks", len(chunks))
+
+                # Keep the lexical and title indexes in step with the vector store
+                with telemetry.span("ingest.index", chunks=len(chunks)):
+                    index_chunks(self.config, chunks)
+
+                return True
             
         except Exception as e:
             print(f"Error processing documents: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def process_stream(
+        self,
+        files: Iterable[Tuple[Any, List]],
+        select: Optional[Callable[[Any, List], List]] = None,
+    ) -> List:
+        """
+        Stream (key, pages) pairs through split → embed → store without holding
+        every page in memory; returns the keys of the files that were stored
+        """
+        try:
+            with telemetry.trace("ingest"):
+                with telemetry.span("ingest.stream"):
+                    ingested, stats = ingest_stream(
+                        files,
+                        self.splitter,
+                        self.vector_store.db,
+                        self.vector_store.embeddings,
+                        self.config,
+                        model_name=self.vector_store.embedding_model,
+                        select=select,
+                    )
+                    telemetry.record(**stats)
+                if not ingested:
+                    print("No chunks created from documents")
+                    return []
+                bump_corpus_version()
+                telemetry.count("ingested_chunks", stats["chunks"])
+                print(f"Successfully streamed {stats['files']} file(s), {stats['chunks']} chunks to vector store")
+                return ingested
+
+        except Exception as e:
+            print(f"Error processing documents: {e}")
+            return []
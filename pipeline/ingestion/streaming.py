@@ -0,0 +1,127 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from common.embedding_cache import get_chunk_embedding_cache
+from .chunk_ids import assign_chunk_ids
+from .embedder import embed_and_store, embedding_config
+from ..storage.indexes import index_chunks
+
+_DONE = object()
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def streaming_config(cfg: dict) -> Dict:
+    streaming = cfg.get("processing", {}).get("streaming", {})
+    return {
+        "enabled": streaming.get("enabled", False),
+        "queue_size": streaming.get("queue_size", 4),
+        "index_flush_chunks": streaming.get("index_flush_chunks", 1000),
+    }
+
+def background(items: Iterable, maxsize: int) -> Iterator:
+    """
+    Run an iterator in a worker thread and yield its items through a bounded
+    queue, so the producer runs ahead of the consumer by at most `maxsize`
+    items. Producer errors are re-raised in the consumer; if the consumer
+    stops early the producer is told to stop.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failed(e))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+def ingest_stream(
+    files: Iterable[Tuple[Any, List]],
+    splitter,
+    db,
+    embeddings,
+    cfg: dict,
+    model_name: Optional[str] = None,
+    select: Optional[Callable[[Any, List], List]] = None,
+) -> Tuple[List, Dict]:
+    """
+    Ingest (key, pages) pairs, one per source file, as overlapping stages:
+    parsing feeds the splitter through a bounded queue of files, the splitter
+    feeds embedding through a bounded queue of chunks, and every embedded batch
+    is written to the store (and indexed) before the next is pulled. Memory
+    stays at a few files and batches whatever the corpus size.
+
+    `select(key, chunks)` may narrow a file's chunks to those that need
+    storing (see VersionPlanner). Returns the keys of the files that were
+    ingested (for the caller to register once everything is stored) and the
+    run stats.
+    """
+    options = streaming_config(cfg)
+    emb_options = embedding_config(cfg)
+    ingested: List = []
+    counts = {"files": 0, "pages": 0}
+
+    def chunks() -> Iterator:
+        for key, pages in background(files, options["queue_size"]):
+            if not pages:
+                continue
+            file_chunks = assign_chunk_ids(splitter.split_documents(pages))
+            if select:
+                file_chunks = select(key, file_chunks)
+            ingested.append(key)
+            counts["files"] += 1
+            counts["pages"] += len(pages)
+            yield from file_chunks
+
+    # Secondary indexes rewrite their file on every update, so batch them up
+    to_index: List = []
+
+    def flush() -> None:
+        if to_index:
+            index_chunks(cfg, to_index)
+            to_index.clear()
+
+    def stored(batch: List) -> None:
+        to_index.extend(batch)
+        if len(to_index) >= options["index_flush_chunks"]:
+            flush()
+
+    stats = embed_and_store(
+        db,
+        background(chunks(), options["queue_size"] * emb_options["batch_size"]),
+        embeddings,
+        model_name=model_name,
+        on_batch=stored,
+        cache=get_chunk_embedding_cache(cfg, model_name),
+        **emb_options,
+    )
+    flush()
+    stats.update(counts)
+    return ingested, stats
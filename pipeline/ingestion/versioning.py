@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+from ..storage.indexes import remove_from_indexes, update_index_metadata
+from .embedder import write_metadata
+
+class VersionPlanner:
+    """
+    Incremental replacement of documents that are new versions of ones already
+    ingested. Chunk ids are content-derived, so diffing the new version's ids
+    against the superseded version's tells which chunks are new (embedded and
+    stored), unchanged (kept, with their metadata refreshed to the new
+    version's) and gone (deleted once the run succeeds).
+    Work is proportional to the changed document, not the corpus.
+
+    `tracker` is either document tracker; keys are (path, ...) tuples as
+    yielded by the ingestion iterators.
+    """
+
+    def __init__(self, tracker, db, cfg: dict):
+        self.tracker = tracker
+        self.db = db
+        self.cfg = cfg
+        self.chunk_ids: Dict[Path, List[str]] = {}
+        self.superseded: Dict[Path, List[str]] = {}
+        self.retained: Dict[Path, List] = {}
+        self.stats = {"updated_files": 0, "unchanged_chunks": 0, "new_chunks": 0, "removed_chunks": 0}
+
+    def _stored_ids(self, title: str) -> List[str]:
+        """Chunk ids of a version registered before the registry recorded them"""
+        where = {"title": title}
+        if hasattr(self.db, "rows_for_filter"):
+            return [self.db.document_at(int(row)).id for row in self.db.rows_for_filter(where)]
+        return self.db.get(where=where, include=[])["ids"]
+
+    def select(self, key: Any, chunks: List) -> List:
+        """Record the file's chunk ids and return only the chunks that still need storing"""
+        path = Path(key[0])
+        ids = [c.id for c in chunks]
+        self.chunk_ids[path] = ids
+        previous = self.tracker.previous_version(path)
+        if not previous:
+            return chunks
+
+        entry = previous[1]
+        old_ids = set(entry.get("chunk_ids") or self._stored_ids(entry.get("title") or path.stem))
+        fresh = [c for c in chunks if c.id not in old_ids]
+        self.retained[path] = [c for c in chunks if c.id in old_ids]
+        self.superseded[path] = sorted(old_ids - set(ids))
+        self.stats["updated_files"] += 1
+        self.stats["unchanged_chunks"] += len(chunks) - len(fresh)
+        self.stats["new_chunks"] += len(fresh)
+        self.stats["removed_chunks"] += len(self.superseded[path])
+        return fresh
+
+    def select_all(self, keys: Iterable, chunks: List) -> List:
+        """select() for chunks of several files split together (grouped by their source file name)"""
+        by_source: Dict[str, List] = {}
+        for chunk in chunks:
+            by_source.setdefault(chunk.metadata.get("source"), []).append(chunk)
+        selected = []
+        for key in keys:
+            selected.extend(self.select(key, by_source.get(Path(key[0]).name, [])))
+        return selected
+
+    def remove_superseded(self) -> int:
+        """
+        Delete chunks only the superseded versions had, from the store and the
+        secondary indexes, and give the chunks the new versions kept their
+        new metadata (effective date, archived path, ...)
+        """
+        retained = [c for file_chunks in self.retained.values() for c in file_chunks]
+        if retained:
+            write_metadata(self.db, retained)
+            update_index_metadata(self.cfg, retained)
+        ids = [cid for file_ids in self.superseded.values() for cid in file_ids]
+        if ids:
+            self.db.delete(ids=ids)
+            remove_from_indexes(self.cfg, ids)
+        self.superseded = {}
+        self.retained = {}
+        return len(ids)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
 @dataclass
 class DocMeta:
@@ -7,3 +7,11 @@ class DocMeta:
     section: str | None = None
     # version: str | None = None
     effective_date: str | None = None
+
+def chunk_metadata(meta: DocMeta) -> dict:
+    """DocMeta fields plus derived fields that vector store filters can range over"""
+    fields = asdict(meta)
+    if meta.effective_date:
+        # "YYYY-MM-DD" -> YYYYMMDD so $gte/$lte work in Chroma
+        fields["effective_ord"] = int(meta.effective_date.replace("-", "")[:8])
+    return fields
@@ -0,0 +1,39 @@
+from typing import Any, Dict, List
+
+# Subset of the Chroma `where` syntax understood by the in-process indexes
+_OPS = {
+    "$eq": lambda v, x: v == x,
+    "$ne": lambda v, x: v != x,
+    "$gt": lambda v, x: v is not None and v > x,
+    "$gte": lambda v, x: v is not None and v >= x,
+    "$lt": lambda v, x: v is not None and v < x,
+    "$lte": lambda v, x: v is not None and v <= x,
+    "$in": lambda v, x: v in x,
+    "$nin": lambda v, x: v not in x,
+}
+
+def metadata_matches(meta: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style metadata filter against one metadata dict"""
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(metadata_matches(meta, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(metadata_matches(meta, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            value = meta.get(key)
+            for op, operand in cond.items():
+                if op not in _OPS:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                try:
+                    if not _OPS[op](value, operand):
+                        return False
+                except TypeError:
+                    return False
+        elif meta.get(key) != cond:
+            return False
+    return True
+
+def matching_rows(metadatas: List[Dict[str, Any]], where: Dict[str, Any]) -> List[int]:
+    return [i for i, meta in enumerate(metadatas) if metadata_matches(meta, where)]
@@ -0,0 +1,31 @@
+from typing import List
+from common.resources import get_resources
+
+def index_chunks(cfg: dict, chunks: List) -> None:
+    """Update the secondary indexes (BM25, title → chunk ids) after chunks are stored"""
+    resources = get_resources()
+    if cfg["retrieval"]["hybrid"].get("enabled", False):
+        resources.get_lexical_index(cfg).add_documents(chunks)
+    if cfg["retrieval"].get("filters", {}).get("enabled", False):
+        resources.get_title_index(cfg).add_documents(chunks)
+
+def update_index_metadata(cfg: dict, chunks: List) -> None:
+    """Refresh the metadata the BM25 index returns for already indexed chunks (titles do not change)"""
+    if chunks and cfg["retrieval"]["hybrid"].get("enabled", False):
+        get_resources().get_lexical_index(cfg).update_metadata(chunks)
+
+def remove_from_indexes(cfg: dict, ids: List[str]) -> None:
+    """Drop chunks (e.g. of a superseded document version) from the secondary indexes"""
+    if not ids:
+        return
+    resources = get_resources()
+    if cfg["retrieval"]["hybrid"].get("enabled", False):
+        resources.get_lexical_index(cfg).delete(ids)
+    if cfg["retrieval"].get("filters", {}).get("enabled", False):
+        resources.get_title_index(cfg).delete(ids)
+
+def reset_indexes(cfg: dict) -> None:
+    """Clear the secondary indexes alongside a vector store reset"""
+    resources = get_resources()
+    resources.get_lexical_index(cfg).reset()
+    resources.get_title_index(cfg).reset()
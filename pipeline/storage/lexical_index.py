@@ -0,0 +1,286 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from pipeline.storage.filters import matching_rows
+
+_MAX_PARAMS = 500  # Stay well under SQLite's bound-parameter limit
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens. Compound identifiers such as "HR-102" or "form_7.a"
+    are kept whole and also split into their parts so both spellings match.
+    """
+    tokens = []
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        tokens.append(tok)
+        if not tok.isalnum():
+            tokens.extend(p for p in re.split(r"[-_./]", tok) if p)
+    return tokens
+
+class BM25Index:
+    """
+    Incrementally updated BM25 inverted index persisted in SQLite (one row per
+    chunk, one per (term, chunk) posting), so an update writes only the new
+    chunks' rows. Writers take SQLite's exclusive write lock, which serializes
+    concurrent ingesters across processes. Postings are mirrored in memory as
+    NumPy arrays so query scoring is vectorized per term. Deletes leave holes
+    (None) in the mirror's positions, which the next full load compacts.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: write transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "row INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE, text TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, length INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT NOT NULL, row INTEGER NOT NULL, tf INTEGER NOT NULL, "
+            "PRIMARY KEY (term, row)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_by_row ON postings (row);"
+        )
+        self._load()
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+    def _data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_stale(self) -> bool:
+        """True if another process committed changes since we loaded the index"""
+        return self._data_version() != self._version
+
+    def _load(self) -> None:
+        """Rebuild the in-memory mirror (positions are dense, in stored row order)"""
+        with self._lock:
+            self.docs: List[Optional[dict]] = []
+            self.doc_len: List[int] = []
+            self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+            self._pos_by_id: Dict[str, int] = {}
+            self._pos_by_row: Dict[int, int] = {}
+            self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+            self._doc_len_arr: Optional[np.ndarray] = None
+            self._filter_masks: Dict[Tuple[str, int], np.ndarray] = {}
+            self._n_docs = 0
+            self._total_len = 0
+            # Read both tables from one snapshot (a writer's transaction already is one)
+            snapshot = not self._conn.in_transaction
+            if snapshot:
+                self._conn.execute("BEGIN")
+            try:
+                self._version = self._data_version()
+                for row, doc_id, text, metadata, length in self._conn.execute(
+                    "SELECT row, id, text, metadata, length FROM docs ORDER BY row"
+                ):
+                    self._append_doc(row, doc_id, text, json.loads(metadata), length)
+                for term, row, tf in self._conn.execute("SELECT term, row, tf FROM postings ORDER BY term, row"):
+                    ids, tfs = self.postings.setdefault(term, ([], []))
+                    ids.append(self._pos_by_row[row])
+                    tfs.append(tf)
+            finally:
+                if snapshot:
+                    self._conn.execute("COMMIT")
+
+    def reload(self) -> None:
+        self._load()
+
+    def _append_doc(self, row: int, doc_id: Optional[str], text: str, metadata: dict, length: int) -> int:
+        pos = len(self.docs)
+        self.docs.append({"id": doc_id, "text": text, "metadata": metadata})
+        self.doc_len.append(length)
+        self._pos_by_row[row] = pos
+        if doc_id:
+            self._pos_by_id[doc_id] = pos
+        self._n_docs += 1
+        self._total_len += length
+        return pos
+
+    @contextmanager
+    def _write(self):
+        """Write transaction holding the database write lock; the mirror is brought up to date first"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.is_stale():
+                    self._load()
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._load()
+                raise
+
+    def add_documents(self, documents: List[Document]) -> None:
+        """Index new chunks (chunks already indexed by id are skipped); only their rows are written"""
+        if not documents:
+            return
+        with self._write() as conn:
+            for doc in documents:
+                # Ids are content-derived, so an indexed id already has this text
+                if doc.id and doc.id in self._pos_by_id:
+                    continue
+                tokens = tokenize(doc.page_content)
+                counts: Dict[str, int] = {}
+                for tok in tokens:
+                    counts[tok] = counts.get(tok, 0) + 1
+                metadata = dict(doc.metadata)
+                row = conn.execute(
+                    "INSERT INTO docs (id, text, metadata, length) VALUES (?, ?, ?, ?)",
+                    (doc.id, doc.page_content, json.dumps(metadata), len(tokens)),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO postings (term, row, tf) VALUES (?, ?, ?)",
+                    [(tok, row, tf) for tok, tf in counts.items()],
+                )
+                pos = self._append_doc(row, doc.id, doc.page_content, metadata, len(tokens))
+                for tok, tf in counts.items():
+                    ids, tfs = self.postings.setdefault(tok, ([], []))
+                    ids.append(pos)
+                    tfs.append(tf)
+                    self._arrays.pop(tok, None)
+            self._doc_len_arr = None
+
+    def update_metadata(self, documents: List[Document]) -> int:
+        """Replace the stored metadata of indexed chunks (text and postings are unchanged)"""
+        changed = []
+        with self._write() as conn:
+            for doc in documents:
+                pos = self._pos_by_id.get(doc.id)
+                if pos is None or self.docs[pos]["metadata"] == doc.metadata:
+                    continue
+                metadata = dict(doc.metadata)
+                conn.execute("UPDATE docs SET metadata = ? WHERE id = ?", (json.dumps(metadata), doc.id))
+                changed.append((pos, metadata))
+            for pos, metadata in changed:
+                self.docs[pos]["metadata"] = metadata
+            if changed:
+                self._filter_masks = {}
+        return len(changed)
+
+    def delete(self, ids) -> int:
+        """Remove chunks by id; returns how many were removed"""
+        ids = [i for i in dict.fromkeys(ids) if i]
+        if not ids:
+            return 0
+        with self._write() as conn:
+            rows, terms = [], set()
+            for i in range(0, len(ids), _MAX_PARAMS):
+                part = ids[i:i + _MAX_PARAMS]
+                marks = ",".join("?" * len(part))
+                rows.extend(r for r, in conn.execute(f"SELECT row FROM docs WHERE id IN ({marks})", part))
+            for i in range(0, len(rows), _MAX_PARAMS):
+                part = rows[i:i + _MAX_PARAMS]
+                marks = ",".join("?" * len(part))
+                terms.update(t for t, in conn.execute(f"SELECT DISTINCT term FROM postings WHERE row IN ({marks})", part))
+                conn.execute(f"DELETE FROM postings WHERE row IN ({marks})", part)
+                conn.execute(f"DELETE FROM docs WHERE row IN ({marks})", part)
+            # Only the deleted chunks' postings lists and statistics change in the mirror
+            removed = {self._pos_by_row.pop(row) for row in rows}
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                kept = [(pos, tf) for pos, tf in zip(*posting) if pos not in removed]
+                if kept:
+                    self.postings[term] = ([pos for pos, _ in kept], [tf for _, tf in kept])
+                else:
+                    del self.postings[term]
+                self._arrays.pop(term, None)
+            for pos in removed:
+                self._pos_by_id.pop(self.docs[pos]["id"], None)
+                self._n_docs -= 1
+                self._total_len -= self.doc_len[pos]
+                self.docs[pos] = None
+                self.doc_len[pos] = 0
+            if removed:
+                self._doc_len_arr = None
+                self._filter_masks = {}
+        return len(rows)
+
+    def reset(self) -> None:
+        """Remove all documents from the index"""
+        with self._write() as conn:
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM docs")
+        self._load()
+
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        arrs = self._arrays.get(term)
+        if arrs is None:
+            posting = self.postings.get(term)
+            if posting is None:
+                return None
+            arrs = (np.asarray(posting[0], dtype=np.int64), np.asarray(posting[1], dtype=np.float32))
+            self._arrays[term] = arrs
+        return arrs
+
+    def _to_document(self, i: int) -> Document:
+        rec = self.docs[i]
+        return Document(page_content=rec["text"], metadata=rec["metadata"], id=rec.get("id"))
+
+    def _filter_mask(self, where: dict) -> np.ndarray:
+        key = (json.dumps(where, sort_keys=True), len(self.docs))
+        mask = self._filter_masks.get(key)
+        if mask is None:
+            mask = np.zeros(len(self.docs), dtype=bool)
+            mask[matching_rows([d["metadata"] if d else {} for d in self.docs], where)] = True
+            self._filter_masks = {key: mask}
+        return mask
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        where: Optional[dict] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[Tuple[Document, float]]:
+        """Return the top-k (Document, BM25 score) pairs for query, optionally metadata-filtered or limited to chunk ids"""
+        with self._lock:
+            n_docs = self._n_docs
+            terms = set(tokenize(query))
+            if not n_docs or not terms:
+                return []
+            if self._doc_len_arr is None:
+                self._doc_len_arr = np.asarray(self.doc_len, dtype=np.float32)
+            doc_len = self._doc_len_arr
+            avg_len = max(self._total_len / n_docs, 1.0)
+            norm = self.k1 * (1.0 - self.b + self.b * doc_len / avg_len)
+
+            scores = np.zeros(len(self.docs), dtype=np.float32)
+            for term in terms:
+                arrs = self._term_arrays(term)
+                if arrs is None:
+                    continue
+                positions, tfs = arrs
+                df = len(positions)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                scores[positions] += idf * tfs * (self.k1 + 1.0) / (tfs + norm[positions])
+            if where:
+                scores[~self._filter_mask(where)] = 0.0
+            if ids is not None:
+                allowed = np.zeros(len(scores), dtype=bool)
+                allowed[[self._pos_by_id[i] for i in ids if i in self._pos_by_id]] = True
+                scores[~allowed] = 0.0
+
+            k = min(k, n_docs)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (self._to_document(i), float(scores[i]))
+                for i in top
+                if scores[i] > 0
+            ]
@@ -0,0 +1,452 @@
+import fcntl
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore as LCVectorStore
+from pipeline.storage.filters import matching_rows
+
+_DTYPES = {"float16": np.float16, "int8": np.int8, "float32": np.float32}
+_BLOCK_ROWS = 65536
+_FILTER_CACHE_SIZE = 64
+
+class NumpyVectorStore(LCVectorStore):
+    """
+    Exact brute-force vector index over a memory-mapped embedding matrix.
+
+    Embeddings are L2-normalized and stored as float16 or int8 (with a float32
+    per-row scale) in append-only files, so many processes can map the same
+    pages. A small header holds the committed row count; readers never see
+    rows whose documents have not been written yet, and writers first cut off
+    anything a crashed writer left past it. Writes upsert by id: a
+    replaced or deleted row is tombstoned and skipped by every read.
+
+    Layout under <persist_directory>/<collection_name>.npvec/:
+        header.json  {"dim", "dtype", "count", "deleted", "docs_bytes", "deleted_bytes", "epoch"}
+        vectors.bin  count x dim rows of dtype
+        scales.bin   count float32 row scales (int8 only)
+        docs.jsonl   one {"id", "text", "metadata"} per row
+        deleted.txt  one tombstoned row number per line (first `deleted` lines)
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        collection_name: str,
+        embedding_function: Embeddings,
+        dtype: str = "float16",
+    ):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported numpy vector store dtype: {dtype}")
+        self.root = Path(persist_directory) / f"{collection_name}.npvec"
+        self.collection_name = collection_name
+        self.embedding_function = embedding_function
+        self.dtype = dtype
+        self._lock = threading.RLock()
+        self._reset_view()
+
+    # ----- storage -----
+
+    def _reset_view(self) -> None:
+        self._header_stamp = None
+        self._epoch = None
+        self._count = 0
+        self._dim = None
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._docs: List[dict] = []
+        self._row_by_id: dict = {}
+        self._filter_rows: dict = {}
+        self._docs_offset = 0
+        self._deleted: set = set()
+        self._deleted_lines = 0
+        self._deleted_offset = 0
+        self._live: Optional[np.ndarray] = None
+
+    @property
+    def _header_path(self) -> Path:
+        return self.root / "header.json"
+
+    def _read_header(self) -> dict:
+        try:
+            with self._header_path.open("r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"dim": None, "dtype": self.dtype, "count": 0}
+
+    def _write_header(self, header: dict) -> None:
+        tmp = self._header_path.with_suffix(".tmp")
+        with tmp.open("w") as f:
+            json.dump(header, f)
+        os.replace(tmp, self._header_path)
+
+    @contextmanager
+    def _writer_lock(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self, force: bool = False) -> None:
+        """
+        Re-map the files if another writer committed new rows. Readers skip the
+        header read while its stat is unchanged; writers pass force=True, since
+        two commits within one mtime tick can leave the stat identical.
+        """
+        try:
+            st = self._header_path.stat()
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            if self._header_stamp is not None:
+                self._reset_view()
+            return
+        if stamp == self._header_stamp and not force:
+            return
+
+        header = self._read_header()
+        count, dim = header["count"], header["dim"]
+        if header.get("epoch") != self._epoch:
+            # Collection was reset and rebuilt underneath us
+            self._reset_view()
+            self._epoch = header.get("epoch")
+        elif count == self._count and header.get("deleted", 0) == self._deleted_lines:
+            self._header_stamp = stamp
+            return
+        self.dtype = header.get("dtype", self.dtype)
+        np_dtype = _DTYPES[self.dtype]
+        if count:
+            self._vectors = np.memmap(self.root / "vectors.bin", dtype=np_dtype, mode="r", shape=(count, dim))
+            if self.dtype == "int8":
+                self._scales = np.memmap(self.root / "scales.bin", dtype=np.float32, mode="r", shape=(count,))
+        with (self.root / "docs.jsonl").open("r", encoding="utf-8") as f:
+            f.seek(self._docs_offset)
+            while len(self._docs) < count:
+                line = f.readline()
+                if not line:
+                    break
+                rec = json.loads(line)
+                self._row_by_id[rec["id"]] = len(self._docs)
+                self._docs.append(rec)
+            self._docs_offset = f.tell()
+        self._read_tombstones(header.get("deleted", 0))
+        if self._deleted:
+            self._live = np.setdiff1d(np.arange(count), np.fromiter(self._deleted, dtype=np.int64))
+        self._count, self._dim, self._header_stamp = count, dim, stamp
+
+    def _read_tombstones(self, committed: int) -> None:
+        if self._deleted_lines >= committed:
+            return
+        with (self.root / "deleted.txt").open("r") as f:
+            f.seek(self._deleted_offset)
+            while self._deleted_lines < committed:
+                line = f.readline()
+                if not line:
+                    break
+                self._deleted_lines += 1
+                row = int(line)
+                self._deleted.add(row)
+                doc_id = self._docs[row]["id"]
+                if self._row_by_id.get(doc_id) == row:
+                    del self._row_by_id[doc_id]
+            self._deleted_offset = f.tell()
+
+    @staticmethod
+    def _truncate(path: Path, size: int) -> None:
+        if path.exists() and path.stat().st_size > size:
+            os.truncate(path, size)
+
+    def _truncate_uncommitted(self, header: dict) -> None:
+        """
+        Cut off rows a crashed writer appended past the committed count, so the
+        next append lands right after the last committed row. Call under the
+        writer lock after _refresh(force=True); headers written before
+        docs_bytes was recorded fall back to the refreshed view's offset.
+        """
+        row_bytes = 0
+        if header["dim"] is not None:
+            row_bytes = header["dim"] * np.dtype(_DTYPES[header["dtype"]]).itemsize
+        self._truncate(self.root / "vectors.bin", header["count"] * row_bytes)
+        self._truncate(self.root / "scales.bin", header["count"] * 4 if header["dtype"] == "int8" else 0)
+        self._truncate(self.root / "docs.jsonl", header.get("docs_bytes", self._docs_offset))
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            q = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return q, scales.astype(np.float32)
+        return vectors.astype(_DTYPES[self.dtype]), None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    # ----- writes -----
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Upsert pre-computed embeddings by id: new rows are appended and any
+        existing rows with the same ids tombstoned, committed atomically via
+        the header
+        """
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+        # Last write wins for ids repeated within the call
+        keep = list({doc_id: i for i, doc_id in enumerate(ids)}.values())
+        if len(keep) < len(ids):
+            texts, embeddings = [texts[i] for i in keep], [embeddings[i] for i in keep]
+            metadatas, ids = [metadatas[i] for i in keep], [ids[i] for i in keep]
+        vectors = self._normalize(embeddings)
+
+        with self._lock, self._writer_lock():
+            self._refresh(force=True)
+            replaced = [self._row_by_id[i] for i in ids if i in self._row_by_id]
+            header = self._read_header()
+            if header["dim"] is None:
+                header = {"dim": int(vectors.shape[1]), "dtype": self.dtype, "count": 0, "epoch": uuid.uuid4().hex}
+            elif header["dim"] != vectors.shape[1]:
+                raise ValueError(f"Embedding dim {vectors.shape[1]} does not match index dim {header['dim']}")
+            self._truncate_uncommitted(header)
+            self.dtype = header["dtype"]
+            encoded, scales = self._encode(vectors)
+            with open(self.root / "vectors.bin", "ab") as f:
+                f.write(np.ascontiguousarray(encoded).tobytes())
+            if scales is not None:
+                with open(self.root / "scales.bin", "ab") as f:
+                    f.write(scales.tobytes())
+            with (self.root / "docs.jsonl").open("a", encoding="utf-8") as f:
+                for doc_id, text, meta in zip(ids, texts, metadatas):
+                    f.write(json.dumps({"id": doc_id, "text": text, "metadata": meta}) + "\n")
+                header["docs_bytes"] = f.tell()
+            header["count"] += len(texts)
+            self._append_tombstones(header, replaced)
+            self._write_header(header)
+        return list(ids)
+
+    def update_metadata(self, ids: List[str], metadatas: List[dict]) -> int:
+        """
+        Replace the metadata of stored rows: rows whose metadata changed are
+        upserted again with their existing vectors. Returns how many changed.
+        """
+        with self._lock:
+            self._refresh()
+            changed = {
+                doc_id: meta
+                for doc_id, meta in zip(ids, metadatas)
+                if doc_id in self._row_by_id and self._docs[self._row_by_id[doc_id]]["metadata"] != meta
+            }
+            if not changed:
+                return 0
+            texts = [self._docs[self._row_by_id[doc_id]]["text"] for doc_id in changed]
+            vectors = self.get_vectors_by_id(list(changed))
+            self.add_embeddings(texts, [vectors[i] for i in changed], list(changed.values()), list(changed))
+        return len(changed)
+
+    def _append_tombstones(self, header: dict, rows: List[int]) -> None:
+        """Append tombstones after the committed ones (dropping any a crashed writer left behind)"""
+        rows = list(dict.fromkeys(rows))
+        if not rows:
+            return
+        self._truncate(self.root / "deleted.txt", header.get("deleted_bytes", self._deleted_offset))
+        with (self.root / "deleted.txt").open("a") as f:
+            f.write("".join(f"{row}\n" for row in rows))
+            header["deleted_bytes"] = f.tell()
+        header["deleted"] = header.get("deleted", 0) + len(rows)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Tombstone the rows with these ids (space is reclaimed only by a rebuild)"""
+        if not ids:
+            return False
+        with self._lock, self._writer_lock():
+            self._refresh(force=True)
+            rows = [self._row_by_id[i] for i in ids if i in self._row_by_id]
+            if not rows:
+                return False
+            header = self._read_header()
+            self._append_tombstones(header, rows)
+            self._write_header(header)
+        return True
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self.embedding_function.embed_documents(texts), metadatas, ids)
+
+    def delete_collection(self) -> None:
+        """Remove all stored vectors and documents"""
+        with self._lock:
+            self._reset_view()
+            if self.root.exists():
+                shutil.rmtree(self.root)
+
+    def count(self) -> int:
+        """Live rows (tombstoned ones excluded)"""
+        with self._lock:
+            self._refresh()
+            return self._count - len(self._deleted)
+
+    # ----- search -----
+
+    def rows_for_filter(self, where: dict) -> np.ndarray:
+        """Row numbers whose metadata match a Chroma-style `where` filter (cached per filter)"""
+        with self._lock:
+            self._refresh()
+            key = (json.dumps(where, sort_keys=True), self._count, len(self._deleted))
+            rows = self._filter_rows.get(key)
+            if rows is None:
+                rows = np.asarray(matching_rows([d["metadata"] for d in self._docs], where), dtype=np.int64)
+                if self._deleted:
+                    rows = np.intersect1d(rows, self._live)
+                if len(self._filter_rows) >= _FILTER_CACHE_SIZE:
+                    self._filter_rows.pop(next(iter(self._filter_rows)))
+                self._filter_rows[key] = rows
+            return rows
+
+    def rows_for_ids(self, ids: List[str]) -> np.ndarray:
+        """Live row numbers of the given chunk ids (unknown ids are ignored)"""
+        with self._lock:
+            self._refresh()
+            rows = [self._row_by_id[i] for i in ids if i in self._row_by_id]
+        return np.unique(np.asarray(rows, dtype=np.int64))
+
+    def search_vectors(
+        self,
+        queries: np.ndarray,
+        k: int,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Exact top-k by cosine similarity for a batch of query vectors, optionally
+        restricted to the given row numbers. Scans the matrix in blocks so
+        float16/int8 rows are upcast a block at a time.
+        """
+        with self._lock:
+            self._refresh()
+            n = self._count
+            vectors, scales = self._vectors, self._scales
+            if rows is None and self._deleted:
+                rows = self._live
+        queries = self._normalize(np.atleast_2d(queries))
+        if rows is not None:
+            n = len(rows)
+        if not n or k <= 0:
+            return [[] for _ in range(len(queries))]
+        k = min(k, n)
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, n, _BLOCK_ROWS):
+            if rows is None:
+                row_ids = np.arange(start, min(start + _BLOCK_ROWS, n))
+                block = np.asarray(vectors[start:start + _BLOCK_ROWS], dtype=np.float32)
+            else:
+                row_ids = rows[start:start + _BLOCK_ROWS]
+                block = np.asarray(vectors[row_ids], dtype=np.float32)
+            sims = queries @ block.T
+            if scales is not None:
+                sims *= scales[row_ids]
+            ids = np.broadcast_to(row_ids, sims.shape)
+            best_scores = np.concatenate([best_scores, sims], axis=1)
+            best_ids = np.concatenate([best_ids, ids], axis=1)
+            if best_scores.shape[1] > k:
+                part = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, part, axis=1)
+                best_ids = np.take_along_axis(best_ids, part, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        return [
+            [(int(i), float(s)) for i, s in zip(row_ids, row_scores)]
+            for row_ids, row_scores in zip(best_ids, best_scores)
+        ]
+
+    def get_vectors_by_id(self, ids: List[str]) -> dict:
+        """Return {id: normalized float32 vector} for the ids present in the index"""
+        with self._lock:
+            self._refresh()
+            found = {i: self._row_by_id[i] for i in ids if i in self._row_by_id}
+            if not found:
+                return {}
+            rows = np.fromiter(found.values(), dtype=np.int64)
+            vecs = np.asarray(self._vectors[rows], dtype=np.float32)
+            if self._scales is not None:
+                vecs *= self._scales[rows][:, None]
+        return dict(zip(found.keys(), vecs))
+
+    def document_at(self, row: int) -> Document:
+        rec = self._docs[row]
+        return Document(page_content=rec["text"], metadata=rec["metadata"], id=rec["id"])
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+    ) -> List[Tuple[Document, float]]:
+        rows = self.rows_for_filter(filter) if filter else None
+        hits = self.search_vectors(np.asarray([embedding]), k, rows=rows)[0]
+        return [(self.document_at(i), s) for i, s in hits]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding_function.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        # Scores are already cosine similarities in [-1, 1]
+        return lambda score: score
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        persist_directory: str = "numpy_db",
+        collection_name: str = "docs",
+        dtype: str = "float16",
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(persist_directory, collection_name, embedding, dtype=dtype)
+        store.add_texts(texts, metadatas, ids)
+        return store
@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+_MAX_PARAMS = 500  # Stay well under SQLite's bound-parameter limit
+
+class TitleIndex:
+    """
+    Title → chunk-id index maintained by ingestion, persisted in SQLite (one
+    row per chunk, indexed by title) so adding or deleting a document's chunks
+    writes only those rows. The title list is cached until the database changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: write transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, title TEXT NOT NULL) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS chunks_by_title ON chunks (title);"
+        )
+        self._load()
+
+    def _data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_stale(self) -> bool:
+        """True if another process committed changes since we loaded the index"""
+        with self._lock:
+            return self._data_version() != self._version
+
+    def _load(self) -> None:
+        with self._lock:
+            self._version = self._data_version()
+            self._titles: Optional[List[str]] = None
+
+    def reload(self) -> None:
+        self._load()
+
+    @contextmanager
+    def _write(self):
+        """Write transaction holding the database write lock"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._load()
+
+    def add_documents(self, documents: List) -> None:
+        """Record the ids of newly ingested chunks under their document title"""
+        rows = [(doc.id, doc.metadata.get("title")) for doc in documents if doc.id and doc.metadata.get("title")]
+        if not rows:
+            return
+        with self._write() as conn:
+            conn.executemany("INSERT OR IGNORE INTO chunks (id, title) VALUES (?, ?)", rows)
+
+    def delete(self, ids) -> None:
+        """Drop chunk ids (titles left without chunks disappear with them)"""
+        ids = [i for i in dict.fromkeys(ids) if i]
+        if not ids:
+            return
+        with self._write() as conn:
+            for i in range(0, len(ids), _MAX_PARAMS):
+                part = ids[i:i + _MAX_PARAMS]
+                conn.execute(f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(part))})", part)
+
+    def reset(self) -> None:
+        with self._write() as conn:
+            conn.execute("DELETE FROM chunks")
+
+    def chunk_ids(self, titles: List[str]) -> List[str]:
+        titles = list(dict.fromkeys(titles))
+        ids = []
+        with self._lock:
+            for i in range(0, len(titles), _MAX_PARAMS):
+                part = titles[i:i + _MAX_PARAMS]
+                marks = ",".join("?" * len(part))
+                ids.extend(cid for cid, in self._conn.execute(f"SELECT id FROM chunks WHERE title IN ({marks})", part))
+        return ids
+
+    def all_titles(self) -> List[str]:
+        with self._lock:
+            if self._titles is None:
+                self._titles = [t for t, in self._conn.execute("SELECT DISTINCT title FROM chunks")]
+            return list(self._titles)
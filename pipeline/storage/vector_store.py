@@ -1,38 +1,87 @@
 from pathlib import Path
 from typing import List
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+from common.config import load_config
+from common.embedding_cache import get_chunk_embedding_cache
+from common.resources import get_resources
+from pipeline.corpus_version import bump_corpus_version
+from pipeline.ingestion.chunk_ids import assign_chunk_ids
+from pipeline.ingestion.embedder import embed_and_store, embedding_config, format_stats
+from pipeline.storage.indexes import reset_indexes
+
+BACKENDS = ("chroma", "numpy")
+
+def open_vector_db(
+    persist_directory: str,
+    collection_name: str,
+    embeddings,
+    backend: str = "chroma",
+    numpy_dtype: str = "float16",
+):
+    """Open the configured vector store backend (both expose the LangChain VectorStore API)"""
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+        return Chroma(
+            persist_directory=persist_directory,
+            embedding_function=embeddings,
+            collection_name=collection_name
+        )
+    if backend == "numpy":
+        from pipeline.storage.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(persist_directory, collection_name, embeddings, dtype=numpy_dtype)
+    raise ValueError(f"Unknown vector store backend: {backend} (expected one of {BACKENDS})")
 
 class VectorStore:
     def __init__(
         self, 
         persist_directory: str,
         collection_name: str,
-        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        backend: str = "chroma",
+        numpy_dtype: str = "float16"
     ):
         self.persist_directory = persist_directory
         self.collection_name = collection_name
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
+        self.backend = backend
+        self.numpy_dtype = numpy_dtype
+        self.embedding_model = embedding_model
+        self.embeddings = get_resources().get_embeddings(embedding_model)
         self.db = self._init_db()
 
-    def _init_db(self) -> Chroma:
-        """Initialize or load existing Chroma DB"""
-        return Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings,
-            collection_name=self.collection_name
+    def _init_db(self):
+        """Initialize or load the existing vector DB for the configured backend"""
+        return open_vector_db(
+            self.persist_directory,
+            self.collection_name,
+            self.embeddings,
+            backend=self.backend,
+            numpy_dtype=self.numpy_dtype,
         )
 
-    def add_documents(self, documents: List) -> None:
-        """Add documents to vector store"""
+    def add_documents(self, documents: List, batch_size: int = None, workers: int = None) -> dict:
+        """Embed and add documents batch by batch; returns throughput and peak memory stats"""
         try:
             if not documents:
                 raise ValueError("No documents provided")
-                
-            # Add documents and persist
-            self.db.add_documents(documents)
-            # self.db.persist()
-            print(f"Successfully added and persisted {len(documents)} documents")
+
+            config = load_config()
+            options = embedding_config(config)
+            if batch_size:
+                options["batch_size"] = batch_size
+            if workers:
+                options["workers"] = workers
+
+            # Each batch is written as soon as it is embedded
+            stats = embed_and_store(
+                self.db,
+                assign_chunk_ids(documents),
+                self.embeddings,
+                model_name=self.embedding_model,
+                cache=get_chunk_embedding_cache(config, self.embedding_model),
+                **options,
+            )
+            bump_corpus_version()
+            print(f"Successfully added and persisted {format_stats(stats)}")
+            return stats
             
         except Exception as e:
             print(f"Error adding documents to vector store: {e}")
@@ -40,12 +89,25 @@ class VectorStore:
 
     def reset(self) -> None:
         """Reset the vector store"""
-        self.db._client.delete_collection(self.collection_name)
+        if self.backend == "chroma":
+            self.db._client.delete_collection(self.collection_name)
+        else:
+            self.db.delete_collection()
         self.db = self._init_db()
+        # Retrievers holding the deleted collection must reopen it
+        get_resources().invalidate()
+        reset_indexes(load_config())
+        bump_corpus_version()
+
+    def count(self) -> int:
+        if self.backend == "chroma":
+            return self.db._collection.count()
+        return self.db.count()
 
     def get_stats(self) -> dict:
         """Get vector store statistics"""
         return {
-            "total_documents": self.db._collection.count(),
-            "collection_name": self.collection_name
-        }
\ No newline at end of file
+            "total_documents": self.count(),
+            "collection_name": self.collection_name,
+            "backend": self.backend
+        }
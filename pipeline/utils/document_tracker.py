@@ -1,7 +1,8 @@
 from pathlib import Path
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
 from datetime import datetime
+from pipeline.corpus_version import bump_corpus_version
 
 class DocumentTracker:
     def __init__(self, registry_file: str = "data/document_registry.json"):
@@ -23,14 +24,43 @@ class DocumentTracker:
 
     def register_document(self, original_path: Path, archived_path: Path) -> None:
         """Register a processed document"""
-        doc_info = {
-            "original_path": str(original_path),
-            "archived_path": str(archived_path),
-            "processed_at": datetime.now().isoformat(),
-            "file_size": original_path.stat().st_size
-        }
-        self.registry[str(original_path)] = doc_info
+        self.register_documents([(original_path, archived_path)])
+
+    def previous_version(self, original_path: Path) -> Optional[Tuple[str, Dict]]:
+        """(key, entry) of the registered upload this file replaces, if any"""
+        entry = self.registry.get(str(original_path))
+        return (str(original_path), entry) if entry else None
+
+    def register_documents(
+        self,
+        documents: Sequence[Tuple[Path, Path]],
+        chunk_ids: Optional[Dict[Path, List[str]]] = None,
+    ) -> None:
+        """
+        Register (original, archived) pairs with one registry write and one corpus version bump.
+        Re-uploading a file keeps the earlier versions in the entry's history.
+        """
+        if not documents:
+            return
+        for original_path, archived_path in documents:
+            previous = self.registry.get(str(original_path))
+            doc_info = {
+                "original_path": str(original_path),
+                "archived_path": str(archived_path),
+                "title": original_path.stem,
+                "processed_at": datetime.now().isoformat(),
+                "file_size": original_path.stat().st_size,
+                "version": 1,
+            }
+            if previous:
+                prior = {k: v for k, v in previous.items() if k not in ("history", "chunk_ids", "original_path")}
+                doc_info["version"] = previous.get("version", 1) + 1
+                doc_info["history"] = previous.get("history", []) + [prior]
+            if chunk_ids and original_path in chunk_ids:
+                doc_info["chunk_ids"] = chunk_ids[original_path]
+            self.registry[str(original_path)] = doc_info
         self._save_registry()
+        bump_corpus_version()
 
     def get_processed_files(self) -> List[str]:
         """Get list of processed file paths"""
@@ -0,0 +1,31 @@
+import json
+import os
+import numpy as np
+from pipeline.storage.numpy_store import NumpyVectorStore
+
+def _pin_header_mtime(store: NumpyVectorStore) -> None:
+    # Every commit lands in the same mtime tick, as on coarse-timestamp filesystems
+    os.utime(store.root / "header.json", ns=(1_000_000_000, 1_000_000_000))
+
+def _add(store: NumpyVectorStore, ids, rng) -> None:
+    store.add_embeddings([f"text {i}" for i in ids], rng.normal(size=(len(ids), 8)).tolist(), ids=list(ids))
+    _pin_header_mtime(store)
+
+def test_commits_within_one_mtime_tick_keep_committed_rows(tmp_path):
+    rng = np.random.default_rng(0)
+    store = NumpyVectorStore(str(tmp_path), "docs", None)
+    _add(store, [f"d{i}" for i in range(100)], rng)
+    for i in range(100, 103):
+        _add(store, [f"d{i}"], rng)
+    store.delete(ids=["d0"])
+    _pin_header_mtime(store)
+    store.delete(ids=["d1"])
+    _pin_header_mtime(store)
+    _add(store, ["d5"], rng)  # upsert tombstones the row it replaces
+
+    header = json.loads((store.root / "header.json").read_text())
+    docs = (store.root / "docs.jsonl").read_text().splitlines()
+    deleted = (store.root / "deleted.txt").read_text().splitlines()
+    assert len(docs) == header["count"] == 104
+    assert len(deleted) == header["deleted"] == 3
+    assert NumpyVectorStore(str(tmp_path), "docs", None).count() == 101
@@ -43,7 +43,9 @@ def main():
         st.session_state.vector_store = VectorStore(
             persist_directory=config["vector_store"]["persist_directory"],
             collection_name=config["vector_store"]["collection_name"],
-            embedding_model=config["vector_store"]["embedding_model"]
+            embedding_model=config["vector_store"]["embedding_model"],
+            backend=config["vector_store"].get("backend", "chroma"),
+            numpy_dtype=config["vector_store"].get("numpy", {}).get("dtype", "float16")
         )
     
     # Load and apply CSS